@@ -1,30 +1,63 @@
+import copy
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import tempfile
+import weakref
 from calendar import c
-from typing import Optional, Tuple
+from typing import Dict, Optional, Sequence, Tuple, Type
 
-from matplotlib import pyplot as plt
-from numpy import iterable
+import numpy as np
 
-from maze.cells import CellArray, CellValues, Coords
-from maze.loaders import ExcelToIterablesMixin
+from maze.cells import CellArray, CellValues, Coords, NumpyCellArray
+from maze.graph import PaddedGrid, RoadGraph, dead_end_mask, label_components
+from maze.loaders import BinaryMazeMixin, ExcelToIterablesMixin, TextToIterablesMixin
+from maze.rendering import MazeRenderer, default_renderer
 
-plt.ion()
-MAZE_PLOT, MAZE_AXIS = plt.subplots()
 
-
-class Maze(ExcelToIterablesMixin):
+class Maze(ExcelToIterablesMixin, TextToIterablesMixin, BinaryMazeMixin):
     DEFAULT_ROAD_SYMBOL = CellValues.ROAD
     DEFAULT_BLOCK_SYMBOL = CellValues.BLOCK
+    # Use CellArray here to store the maze as nested tuples of Cell objects
+    DEFAULT_CELL_ARRAY_CLASS: Type[CellArray] = NumpyCellArray
+    # Dead end masks cached at once, one per set of cells kept
+    MAX_DEAD_END_MASKS = 8
 
     def __init__(
         self,
         array,
         road_symbol: Optional[CellValues] = None,
         block_symbol: Optional[CellValues] = None,
+        cell_array_class: Optional[Type[CellArray]] = None,
     ):
         road_symbol = road_symbol or self.DEFAULT_ROAD_SYMBOL
         block_symbol = block_symbol or self.DEFAULT_BLOCK_SYMBOL
 
-        self.cell_array = self.sanitize_maze(array, road_symbol, block_symbol)
+        self.cell_array = self.sanitize_maze(
+            array, road_symbol, block_symbol, cell_array_class
+        )
+        self._subscribers = []
+        self.costs = None
+        self.invalidate_caches()
+
+    @classmethod
+    def from_cell_array(cls, cell_array: CellArray):
+        """Wrap an already sanitized cell array without copying it."""
+        maze = cls.__new__(cls)
+        maze.cell_array = cell_array
+        maze._subscribers = []
+        maze.costs = None
+        maze.invalidate_caches()
+        return maze
+
+    def __getstate__(self):
+        # Subscribers belong to this maze object, copies and pickles start
+        # without any
+        state = self.__dict__.copy()
+        state["_subscribers"] = []
+        return state
 
     @classmethod
     def sanitize_maze(
@@ -32,9 +65,14 @@ class Maze(ExcelToIterablesMixin):
         maze,
         road_symbol: Optional[CellValues] = None,
         block_symbol: Optional[CellValues] = None,
+        cell_array_class: Optional[Type[CellArray]] = None,
     ) -> CellArray:
         road_symbol = road_symbol or cls.DEFAULT_ROAD_SYMBOL
         block_symbol = block_symbol or cls.DEFAULT_BLOCK_SYMBOL
+        cell_array_class = cell_array_class or cls.DEFAULT_CELL_ARRAY_CLASS
+
+        if issubclass(cell_array_class, NumpyCellArray):
+            return cls.sanitize_grid(maze, road_symbol, block_symbol, cell_array_class)
 
         def sanitize_symbol(symbol_in):
             if CellValues(symbol_in) == road_symbol:
@@ -45,7 +83,35 @@ class Maze(ExcelToIterablesMixin):
                 raise RuntimeError(f"Cannot parse symbol {symbol_in}")
 
         sanitized_maze = [[sanitize_symbol(x) for x in row] for row in maze]
-        return CellArray.load_from_iterables(sanitized_maze)
+        return cell_array_class.load_from_iterables(sanitized_maze)
+
+    @staticmethod
+    def sanitize_grid(
+        maze,
+        road_symbol: CellValues,
+        block_symbol: CellValues,
+        cell_array_class: Type[NumpyCellArray] = NumpyCellArray,
+    ) -> NumpyCellArray:
+        """Vectorized version of sanitize_maze that maps the road and block
+        symbols straight into a uint8 grid."""
+        if not isinstance(maze, np.ndarray):
+            row_lengths = [len(row) for row in maze]
+            max_row_len = max(row_lengths)
+            if not all([row_len == max_row_len for row_len in row_lengths]):
+                raise RuntimeError(
+                    f"Expected equal length rows, instead got lengths of: {row_lengths}"
+                )
+        raw = np.asarray(maze)
+
+        is_road = raw == CellValues(road_symbol).value
+        is_block = raw == CellValues(block_symbol).value
+        unparsed = ~(is_road | is_block)
+        if unparsed.any():
+            symbol_in = raw[np.nonzero(unparsed)][0]
+            raise RuntimeError(f"Cannot parse symbol {symbol_in}")
+
+        grid = np.where(is_road, CellValues.ROAD.value, CellValues.BLOCK.value)
+        return cell_array_class(grid.astype(np.uint8))
 
     @property
     def num_rows(self):
@@ -60,6 +126,175 @@ class Maze(ExcelToIterablesMixin):
 
     def set_value(self, coords: Coords, val: CellValues):
         self.cell_array.set_cell_value(coords, CellValues(val))
+        self.invalidate_caches()
+        self.notify_subscribers((coords,))
+
+    def set_values(self, changes: Sequence[Tuple[Coords, CellValues]]):
+        """Apply a batch of (coords, value) changes, invalidating caches and
+        notifying subscribers once for the whole batch."""
+        changed = []
+        try:
+            for coords, val in changes:
+                self.cell_array.set_cell_value(coords, CellValues(val))
+                changed.append(coords)
+        finally:
+            if changed:
+                self.invalidate_caches()
+                self.notify_subscribers(tuple(changed))
+
+    def subscribe(self, callback):
+        """Call callback(maze, changed_coords) after every change made through
+        set_value or set_values. Bound methods are held weakly, so e.g. a
+        solver that subscribes is still freed once nothing else uses it.
+        Other callables are held as they are until unsubscribed."""
+        if callback not in self.subscribers:
+            if inspect.ismethod(callback):
+                self._subscribers.append(weakref.WeakMethod(callback))
+            else:
+                self._subscribers.append(lambda: callback)
+
+    def unsubscribe(self, callback):
+        self._subscribers = [x for x in self._subscribers if x() not in (None, callback)]
+
+    @property
+    def subscribers(self) -> Tuple:
+        """The callbacks subscribed, dropping methods of freed objects."""
+        callbacks = [x() for x in self._subscribers]
+        self._subscribers = [x for x, c in zip(self._subscribers, callbacks) if c is not None]
+        return tuple(c for c in callbacks if c is not None)
+
+    def notify_subscribers(self, changed_coords: Tuple[Coords]):
+        for callback in self.subscribers:
+            callback(self, changed_coords)
+
+    def invalidate_caches(self):
+        """Drop anything derived from the cell values. Called on every change
+        made through the maze, call it yourself after editing cell_array."""
+        self._road_graph = None
+        self._padded_grid = None
+        self._padded_costs = None
+        self._component_labels = None
+        self._dead_end_masks = {}
+        self._content_hash = None
+
+    @property
+    def is_weighted(self) -> bool:
+        return self.costs is not None
+
+    def set_costs(self, costs):
+        """Set the cost of entering each cell, from a (rows, cols) iterable of
+        positive integers, or None to make every step cost 1. Costs are kept
+        as uint16, small costs keep the solvers' bucket queues short."""
+        if costs is None:
+            self.costs = None
+        else:
+            costs = np.asarray(costs)
+            if costs.shape != (self.num_rows, self.num_cols):
+                raise RuntimeError(
+                    f"Expected costs of shape {(self.num_rows, self.num_cols)}, "
+                    f"instead got {costs.shape}"
+                )
+            if not np.issubdtype(costs.dtype, np.integer) and not (costs == np.round(costs)).all():
+                raise RuntimeError("Cell costs must be whole numbers.")
+            if costs.size and (costs.min() < 1 or costs.max() > np.iinfo(np.uint16).max):
+                raise RuntimeError("Cell costs must be between 1 and 65535.")
+            self.costs = costs.astype(np.uint16)
+        self.invalidate_caches()
+
+    @property
+    def padded_costs(self) -> Optional[Sequence[int]]:
+        """Cost of entering each cell, indexed like padded_grid.roads, or None
+        when every step costs 1. Built on first use and cached until the maze
+        is next changed."""
+        if self._padded_costs is None and self.costs is not None:
+            self._padded_costs = np.pad(self.costs, 1, constant_values=0).reshape(-1).tolist()
+        return self._padded_costs
+
+    def min_road_cost(self) -> int:
+        """Smallest cost of entering a road, for admissible heuristics."""
+        if self.costs is None:
+            return 1
+        road_costs = self.costs[self.cell_array.road_mask]
+        return int(road_costs.min()) if road_costs.size else 1
+
+    def path_cost(self, path: Sequence[Coords]) -> int:
+        """Total cost of the cells entered along the path, i.e. every cell but
+        the first. Without costs this is the number of steps."""
+        if len(path) < 2:
+            return 0
+        if self.costs is None:
+            return len(path) - 1
+        xs = np.fromiter((c.x for c in path[1:]), dtype=np.intp, count=len(path) - 1)
+        ys = np.fromiter((c.y for c in path[1:]), dtype=np.intp, count=len(path) - 1)
+        return int(self.costs[ys, xs].sum(dtype=np.int64))
+
+    @property
+    def content_hash(self) -> str:
+        """Hex digest of the maze's shape and cell values, cached until the
+        maze is next changed."""
+        if self._content_hash is None:
+            grid = self.cell_array.grid
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(repr(grid.shape).encode())
+            digest.update(grid.tobytes())
+            self._content_hash = digest.hexdigest()
+        return self._content_hash
+
+    @property
+    def road_graph(self) -> RoadGraph:
+        """Adjacency index of the roads, built on first use and cached until
+        the maze is next changed."""
+        if self._road_graph is None:
+            self._road_graph = RoadGraph.from_road_mask(self.cell_array.road_mask)
+        return self._road_graph
+
+    @property
+    def padded_grid(self) -> PaddedGrid:
+        """Flat byte grid of the roads for search loops, built on first use and
+        cached until the maze is next changed."""
+        if self._padded_grid is None:
+            self._padded_grid = PaddedGrid.from_road_mask(self.cell_array.road_mask)
+        return self._padded_grid
+
+    @property
+    def component_labels(self) -> np.ndarray:
+        """(rows, cols) array labelling each group of connected roads from 1
+        upwards, 0 elsewhere. Built on first use and cached until the maze is
+        next changed."""
+        if self._component_labels is None:
+            self._component_labels = label_components(self.cell_array.road_mask)
+        return self._component_labels
+
+    def is_reachable(self, coords: Coords, other_coords: Coords) -> bool:
+        """Is there a path of roads between the two coords."""
+        if not (self.is_valid_road(coords) and self.is_valid_road(other_coords)):
+            return False
+        labels = self.component_labels
+        return labels[coords.y, coords.x] == labels[other_coords.y, other_coords.x]
+
+    def dead_end_mask(self, keep: Sequence[Coords] = ()) -> np.ndarray:
+        """Boolean array of the roads that only lead to dead ends, other than
+        through the cells in keep. See maze.graph.dead_end_mask. The masks of
+        the last few sets of cells kept are cached until the maze is next
+        changed, and are read only."""
+        key = frozenset(keep)
+        mask = self._dead_end_masks.get(key)
+        if mask is None:
+            if len(self._dead_end_masks) >= self.MAX_DEAD_END_MASKS:
+                del self._dead_end_masks[next(iter(self._dead_end_masks))]
+            mask = dead_end_mask(self.cell_array.road_mask, keep)
+            mask.setflags(write=False)
+            self._dead_end_masks[key] = mask
+        return mask
+
+    def without_dead_ends(self, keep: Sequence[Coords] = ()) -> "Maze":
+        """Return a copy of the maze with its dead ends filled with blocks.
+        Any path between cells in keep is still a path in the copy."""
+        grid = self.cell_array.grid.copy()
+        grid[self.dead_end_mask(keep)] = CellValues.BLOCK.value
+        maze = self.from_cell_array(NumpyCellArray(grid))
+        maze.costs = self.costs
+        return maze
 
     def is_valid_road(self, coords: Coords) -> bool:
         if self.cell_array.is_in_bounds(coords):
@@ -68,11 +303,17 @@ class Maze(ExcelToIterablesMixin):
             return False
 
     def adjacent_roads(self, coords: Coords) -> Tuple[Coords]:
+        if self.cell_array.is_in_bounds(coords):
+            return self.road_graph.neighbours(coords)
         roads = (
             x for x in self.cell_array.adjacent_cells(coords=coords) if self.is_valid_road(x)
         )
         return tuple(roads)
 
+    def adjacent_road_ids(self, flat_id: int):
+        """Return the flat ids of the roads adjacent to a cell, see RoadGraph."""
+        return self.road_graph.neighbour_ids(flat_id)
+
     def apply_path(self, path: Tuple[Coords]):
         for coords in path:
             if self.is_valid_road(coords):
@@ -80,10 +321,12 @@ class Maze(ExcelToIterablesMixin):
             else:
                 raise RuntimeError(f"Coords {coords} are not a valid road.")
 
-    def plot(self):
-        MAZE_AXIS.clear()
-        im = MAZE_AXIS.imshow(self.cell_array.value_array)
-        plt.pause(interval=0.005)  # type: ignore
+    def plot(self, renderer: Optional[MazeRenderer] = None, force: bool = False):
+        """Draw the maze, by default in a shared interactive window. Unless
+        forced, the renderer may skip the frame, see MazeRenderer.is_frame_due."""
+        renderer = renderer or default_renderer()
+        if renderer.is_frame_due() or force:
+            renderer.draw(self.cell_array.grid)
 
     def __repr__(self):
         header_indices = tuple(range(0, self.num_cols))
@@ -104,9 +347,279 @@ class Maze(ExcelToIterablesMixin):
         sheet_name: Optional[str] = None,
         road_symbol: Optional[CellValues] = None,
         block_symbol: Optional[CellValues] = None,
+        cell_array_class: Optional[Type[CellArray]] = None,
+        cost_sheet_name: Optional[str] = None,
     ):
+        """Load a maze from a sheet of a workbook, with the cost of each cell
+        from another sheet of the same shape if cost_sheet_name is given."""
         iterable_maze = cls.load_from_excel(file_path, sheet_name)
-        return cls(iterable_maze, road_symbol=road_symbol, block_symbol=block_symbol)
+        maze = cls(
+            iterable_maze,
+            road_symbol=road_symbol,
+            block_symbol=block_symbol,
+            cell_array_class=cell_array_class,
+        )
+        if cost_sheet_name:
+            maze.set_costs(cls.load_from_excel(file_path, cost_sheet_name))
+        return maze
+
+    @classmethod
+    def load_all_from_excel(
+        cls,
+        file_path: str,
+        road_symbol: Optional[CellValues] = None,
+        block_symbol: Optional[CellValues] = None,
+        use_cache: bool = True,
+        cache_dir: Optional[str] = None,
+    ) -> Dict[str, "Maze"]:
+        """Load every sheet of a workbook, parsing it only once.
+
+        With use_cache the sanitized mazes are saved in the binary maze format
+        under cache_dir (by default .maze_cache next to the workbook), keyed by
+        the workbook's path, modification time and size. Later calls for an
+        unchanged workbook load those instead, without importing pandas.
+        """
+        road_symbol = road_symbol or cls.DEFAULT_ROAD_SYMBOL
+        block_symbol = block_symbol or cls.DEFAULT_BLOCK_SYMBOL
+        if not use_cache:
+            return {
+                sheet_name: cls(rows, road_symbol=road_symbol, block_symbol=block_symbol)
+                for sheet_name, rows in cls.load_all_from_excel_sheets(file_path).items()
+            }
+
+        file_path = os.path.abspath(file_path)
+        cache_dir = cache_dir or os.path.join(os.path.dirname(file_path), ".maze_cache")
+        stat = os.stat(file_path)
+        path_key = hashlib.blake2b(file_path.encode(), digest_size=8).hexdigest()
+        version = (
+            stat.st_mtime_ns,
+            stat.st_size,
+            CellValues(road_symbol).value,
+            CellValues(block_symbol).value,
+        )
+        version_key = hashlib.blake2b(repr(version).encode(), digest_size=8).hexdigest()
+        entry_dir = os.path.join(cache_dir, f"{path_key}-{version_key}")
+        index_path = os.path.join(entry_dir, "index.json")
+
+        if os.path.exists(index_path):
+            with open(index_path) as f:
+                index = json.load(f)
+            return {
+                sheet_name: cls.load_binary(os.path.join(entry_dir, file_name))
+                for sheet_name, file_name in index.items()
+            }
+
+        mazes = cls.load_all_from_excel(
+            file_path, road_symbol, block_symbol, use_cache=False
+        )
+
+        # Write the entry to a temporary directory and move it into place so
+        # a half written entry is never read, then drop older entries for
+        # the same workbook
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_dir = tempfile.mkdtemp(dir=cache_dir)
+        index = {}
+        for i, (sheet_name, maze) in enumerate(mazes.items()):
+            index[sheet_name] = f"{i}.maze"
+            maze.save_binary(os.path.join(temp_dir, index[sheet_name]))
+        with open(os.path.join(temp_dir, "index.json"), "w") as f:
+            json.dump(index, f)
+        try:
+            os.replace(temp_dir, entry_dir)
+        except OSError:
+            # Another process wrote the same entry first
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        for name in os.listdir(cache_dir):
+            if name.startswith(f"{path_key}-") and name != os.path.basename(entry_dir):
+                shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
+        return mazes
+
+    @classmethod
+    def create_maze_from_text(
+        cls,
+        file_path: str,
+        text_format: Optional[str] = None,
+        road_symbol: Optional[CellValues] = None,
+        block_symbol: Optional[CellValues] = None,
+        cell_array_class: Optional[Type[CellArray]] = None,
+        cost_file_path: Optional[str] = None,
+    ):
+        """Load a csv, text or ascii maze, optionally gzipped, see
+        TextToIterablesMixin. The cost of each cell, 1 to 9, can be loaded
+        from a csv or text file of the same shape at cost_file_path."""
+        symbols = cls.load_from_text(file_path, text_format)
+        maze = cls(
+            symbols,
+            road_symbol=road_symbol,
+            block_symbol=block_symbol,
+            cell_array_class=cell_array_class,
+        )
+        if cost_file_path:
+            maze.set_costs(cls.load_from_text(cost_file_path))
+        return maze
+
+    def save_binary(
+        self,
+        file_path: str,
+        packed: bool = False,
+        road_symbol: Optional[CellValues] = None,
+        block_symbol: Optional[CellValues] = None,
+    ):
+        """Save in the binary maze format, see BinaryMazeMixin. The symbols are
+        only recorded in the header, the cells are saved sanitized."""
+        road_symbol = road_symbol or self.DEFAULT_ROAD_SYMBOL
+        block_symbol = block_symbol or self.DEFAULT_BLOCK_SYMBOL
+        self.save_to_binary(
+            file_path,
+            self.cell_array.grid,
+            road_symbol=CellValues(road_symbol).value,
+            block_symbol=CellValues(block_symbol).value,
+            packed=packed,
+        )
+
+    @classmethod
+    def load_binary(cls, file_path: str, mmap: bool = True):
+        """Open a maze saved with save_binary. With mmap the cells are read
+        from disk lazily and the file is never modified."""
+        _, grid = cls.load_from_binary(file_path, mmap=mmap)
+        return cls.from_cell_array(NumpyCellArray(grid, check_values=not mmap))
+
+    @classmethod
+    def convert_excel_to_binary(
+        cls,
+        file_path: str,
+        output_dir: str,
+        sheet_names: Optional[Sequence[str]] = None,
+        packed: bool = False,
+        road_symbol: Optional[CellValues] = None,
+        block_symbol: Optional[CellValues] = None,
+    ) -> Dict[str, str]:
+        """Save sheets of a workbook as <output_dir>/<sheet name>.maze, all
+        sheets by default. Returns the output path of each sheet."""
+        mazes = cls.load_all_from_excel(
+            file_path, road_symbol, block_symbol, use_cache=False
+        )
+        sheet_names = sheet_names or list(mazes)
+        os.makedirs(output_dir, exist_ok=True)
+
+        output_paths = {}
+        for sheet_name in sheet_names:
+            maze = mazes[sheet_name]
+            output_path = os.path.join(output_dir, f"{sheet_name}.maze")
+            maze.save_binary(output_path, packed, road_symbol, block_symbol)
+            output_paths[sheet_name] = output_path
+        return output_paths
+
+
+class MazeView:
+    """Copy-on-write view of a maze for searching.
+
+    The underlying maze is shared and never modified. Cells marked as PATH are
+    held in a small stack on top of it, so marking and unmarking a cell is O(1)
+    instead of copying the maze and re-applying the whole path.
+    """
+
+    def __init__(self, maze: Maze, path: Tuple[Coords] = ()):
+        self.maze = maze
+        self._num_cols = maze.num_cols
+        self._marked = set()
+        self._stack = []
+        # Flat ids pushed or popped since the last take_changes, None until
+        # something first asks for them
+        self._changed = None
+        for coords in path:
+            self.push(coords)
+
+    @property
+    def num_rows(self):
+        return self.maze.num_rows
+
+    @property
+    def num_cols(self):
+        return self._num_cols
+
+    @property
+    def path(self) -> Tuple[Coords]:
+        """Return the marked cells in the order they were pushed."""
+        return tuple(self._stack)
+
+    def _flat_index(self, coords: Coords) -> int:
+        return coords.y * self._num_cols + coords.x
+
+    def is_marked(self, coords: Coords) -> bool:
+        return self._flat_index(coords) in self._marked
+
+    def value(self, coords: Coords) -> CellValues:
+        if self.is_marked(coords):
+            return CellValues.PATH
+        return self.maze.value(coords)
+
+    def is_valid_road(self, coords: Coords) -> bool:
+        return self.maze.is_valid_road(coords) and not self.is_marked(coords)
+
+    def adjacent_roads(self, coords: Coords) -> Tuple[Coords]:
+        roads = (x for x in self.maze.adjacent_roads(coords) if not self.is_marked(x))
+        return tuple(roads)
+
+    def push(self, coords: Coords):
+        """Mark the coords as part of the path."""
+        if not self.is_valid_road(coords):
+            raise RuntimeError(f"Coords {coords} are not a valid road.")
+        flat_id = self._flat_index(coords)
+        self._marked.add(flat_id)
+        self._stack.append(coords)
+        if self._changed is not None:
+            self._changed.add(flat_id)
+
+    def pop(self) -> Coords:
+        """Unmark and return the most recently marked coords."""
+        coords = self._stack.pop()
+        flat_id = self._flat_index(coords)
+        self._marked.discard(flat_id)
+        if self._changed is not None:
+            self._changed.add(flat_id)
+        return coords
+
+    def to_maze(self) -> Maze:
+        """Return a standalone copy of the maze with the marked path applied."""
+        maze = copy.deepcopy(self.maze)
+        maze.apply_path(self.path)
+        return maze
+
+    @property
+    def grid(self) -> np.ndarray:
+        """Return a copy of the maze's grid with the marked cells as PATH."""
+        grid = self.maze.cell_array.grid.copy()
+        if self._marked:
+            flat_ids = np.fromiter(self._marked, dtype=np.int64, count=len(self._marked))
+            grid.reshape(-1)[flat_ids] = CellValues.PATH.value
+        return grid
+
+    def take_changes(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the flat ids of the cells pushed or popped since the last
+        call and their values now, and start again from none. Changes are
+        only tracked after the first call."""
+        changed = self._changed or ()
+        self._changed = set()
+        cell_array = self.maze.cell_array
+        values = [
+            CellValues.PATH.value
+            if x in self._marked
+            else cell_array.get_cell_value(Coords(x % self._num_cols, x // self._num_cols)).value
+            for x in changed
+        ]
+        flat_ids = np.fromiter(changed, dtype=np.int64, count=len(changed))
+        return flat_ids, np.array(values, dtype=np.uint8)
+
+    def plot(self, renderer: Optional[MazeRenderer] = None, force: bool = False):
+        renderer = renderer or default_renderer()
+        # The grid is only composed for frames that will be drawn
+        if renderer.is_frame_due() or force:
+            renderer.draw_view(self)
+
+    def __len__(self):
+        return len(self._stack)
 
 
 def main():
@@ -1,7 +1,8 @@
-from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
 from typing import Optional, Tuple
 
+import numpy as np
 from typing_extensions import Self
 
 
@@ -12,14 +13,45 @@ class CellValues(Enum):
     PATH = 2
 
 
-@dataclass
 class Coords:
+    """Immutable, hashable (x, y) coordinates. Safe to use in sets and as
+    dict keys."""
+
+    __slots__ = ["x", "y"]
+
     x: int
     y: int
 
+    def __init__(self, x: int, y: int):
+        object.__setattr__(self, "x", x)
+        object.__setattr__(self, "y", y)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{self.__class__.__name__} is immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{self.__class__.__name__} is immutable.")
+
     def __eq__(self, other):
+        if not isinstance(other, Coords):
+            return NotImplemented
         return self.x == other.x and self.y == other.y
 
+    def __hash__(self):
+        return hash((self.x, self.y))
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(x={self.x}, y={self.y})"
+
+    def __reduce__(self):
+        return (self.__class__, (self.x, self.y))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
     #Not allowed to change this class
     # def __sub__(self, other):
     #     return Coords(self.x - other.x, self.y - other.y)
@@ -28,6 +60,45 @@ class Coords:
         return Coords(self.x + move_coords.x, self.y + move_coords.y)
 
 
+class CoordsCache:
+    """Interned Coords for the cells of a grid, looked up by flat id
+    (y * num_cols + x). Each cell's Coords is created once on first use and
+    then shared, so hot loops do not allocate new coordinates."""
+
+    __slots__ = ["num_rows", "num_cols", "_interned"]
+
+    def __init__(self, num_rows: int, num_cols: int):
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self._interned = {}
+
+    def flat_id(self, coords: Coords) -> int:
+        return coords.y * self.num_cols + coords.x
+
+    def __getitem__(self, flat_id: int) -> Coords:
+        coords = self._interned.get(flat_id)
+        if coords is None:
+            y, x = divmod(flat_id, self.num_cols)
+            coords = self._interned[flat_id] = Coords(x, y)
+        return coords
+
+    def get(self, x: int, y: int) -> Coords:
+        return self[y * self.num_cols + x]
+
+    def intern(self, coords: Coords) -> Coords:
+        """Return the shared instance equal to the given coords."""
+        return self[self.flat_id(coords)]
+
+    def __len__(self):
+        return len(self._interned)
+
+
+@lru_cache(maxsize=8)
+def interned_coords(num_rows: int, num_cols: int) -> CoordsCache:
+    """Return the shared Coords cache for a grid of the given size."""
+    return CoordsCache(num_rows, num_cols)
+
+
 class Moves:
     __slots__ = []
     UP = Coords(-1, 0)
@@ -124,7 +195,8 @@ class CellArray:
 
     def is_adjacent(self, coords: Coords, other_coords: Coords) -> bool:
         """Are the two sets of coordinates adjacent (ignoring diagonals)."""
-        return other_coords in self.adjacent_cells(coords)
+        distance = abs(coords.x - other_coords.x) + abs(coords.y - other_coords.y)
+        return distance == 1 and self.is_in_bounds(other_coords)
 
     @property
     def value_array(self):
@@ -134,6 +206,24 @@ class CellArray:
         )
         return value_array
 
+    @property
+    def grid(self) -> np.ndarray:
+        """Return a (rows, cols) uint8 array of the cell values."""
+        return np.array(self.value_array, dtype=np.uint8)
+
+    def row_values(self, y: int) -> np.ndarray:
+        """Return the cell values of row y as an array."""
+        return np.array([cell.value.value for cell in self.array[y]], dtype=np.uint8)
+
+    def col_values(self, x: int) -> np.ndarray:
+        """Return the cell values of column x as an array."""
+        return np.array([row[x].value.value for row in self.array], dtype=np.uint8)
+
+    @property
+    def road_mask(self) -> np.ndarray:
+        """Return a boolean array that is True wherever the cell is a road."""
+        return self.grid == CellValues.ROAD.value
+
     @classmethod
     def load_from_iterables(cls, iterables):
         row_lengths = [len(row) for row in iterables]
@@ -157,6 +247,85 @@ class CellArray:
         return " ".join(string_list)
 
 
+class NumpyCellArray(CellArray):
+    """Cell array backed by one contiguous uint8 array of cell values instead
+    of nested tuples of Cell objects."""
+
+    def __init__(self, grid: np.ndarray, check_values: bool = True) -> None:
+        """Wraps the grid without copying it if it is already a C contiguous
+        uint8 array. Pass check_values=False to skip scanning the values, e.g.
+        for a memory-mapped grid that would otherwise be read in full."""
+        grid = np.ascontiguousarray(grid, dtype=np.uint8)
+        if grid.ndim != 2:
+            raise RuntimeError(f"Expected a 2D grid, instead got shape {grid.shape}")
+        if check_values and grid.size and grid.max() > max(x.value for x in CellValues):
+            raise RuntimeError(f"Grid contains values outside of {list(CellValues)}")
+        self._grid = grid
+
+    @property
+    def grid(self) -> np.ndarray:
+        """Read only view of the cell values, change cells through
+        set_cell_value (or the Maze) so blocks stay blocks."""
+        grid = self._grid.view()
+        grid.setflags(write=False)
+        return grid
+
+    @property
+    def array(self) -> Tuple[Tuple[Cell]]:
+        """Nested tuples of Cell objects like CellArray.array, built from the
+        grid on each access. The cells are a copy, setting their values does
+        not change the grid."""
+        return tuple(tuple(Cell(_CELL_VALUES[x]) for x in row) for row in self._grid.tolist())
+
+    def row_values(self, y: int) -> np.ndarray:
+        return self.grid[y, :]
+
+    def col_values(self, x: int) -> np.ndarray:
+        return self.grid[:, x]
+
+    def get_cell_value(self, coords: Coords) -> CellValues:
+        return _CELL_VALUES[self._grid[coords.y, coords.x]]
+
+    def set_cell_value(self, coords: Coords, cell_value: CellValues) -> None:
+        # Same rule as Cell.value, blocks can never be changed
+        value = CellValues(cell_value)
+        if self._grid[coords.y, coords.x] == CellValues.BLOCK.value:
+            raise RuntimeError(f"Cannot change value of type {CellValues.BLOCK}.")
+        self._grid[coords.y, coords.x] = value.value
+
+    @property
+    def num_rows(self) -> int:
+        return self._grid.shape[0]
+
+    @property
+    def num_cols(self) -> int:
+        return self._grid.shape[1]
+
+    def is_in_bounds(self, coords: Coords) -> bool:
+        """Are given coords in the cell array."""
+        rows, cols = self._grid.shape
+        return 0 <= coords.y < rows and 0 <= coords.x < cols
+
+    @property
+    def value_array(self):
+        """Return an array of just the values in each cell."""
+        return tuple(tuple(row) for row in self._grid.tolist())
+
+    @classmethod
+    def load_from_iterables(cls, iterables):
+        row_lengths = [len(row) for row in iterables]
+        max_row_len = max(row_lengths)
+        if not all([row_len == max_row_len for row_len in row_lengths]):
+            raise RuntimeError(
+                f"Expected equal length rows, instead got lengths of: {row_lengths}"
+            )
+        return cls(np.array(iterables, dtype=np.uint8))
+
+
+# Cell values indexed by their integer value, avoids an enum lookup per cell
+_CELL_VALUES = tuple(sorted(CellValues, key=lambda x: x.value))
+
+
 def main():
     maze = CellArray.load_from_iterables(
         iterables=[
@@ -0,0 +1,29 @@
+"""
+Convert Excel maze sheets to the binary maze format.
+
+Run from the repository root:
+    python -m maze.convert mazes.xlsx binary_mazes
+"""
+
+import argparse
+
+from maze.basic_maze import Maze
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("file_path", help="Excel workbook to convert")
+    parser.add_argument("output_dir", help="Directory to write <sheet name>.maze files to")
+    parser.add_argument("--sheets", nargs="+", help="Sheets to convert, defaults to all")
+    parser.add_argument("--packed", action="store_true", help="Bit-pack the cells")
+    args = parser.parse_args()
+
+    output_paths = Maze.convert_excel_to_binary(
+        args.file_path, args.output_dir, args.sheets, packed=args.packed
+    )
+    for sheet_name, output_path in output_paths.items():
+        print(f"{sheet_name} -> {output_path}")
+
+
+if __name__ == "__main__":
+    main()
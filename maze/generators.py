@@ -0,0 +1,291 @@
+"""
+Seeded procedural mazes, built straight into a Maze without going through
+nested lists. Every maze has roads at (0, 0) and the bottom right corner, the
+default start and end coords of BaseMazeSolver, with a path between them.
+
+Perfect maze generators work on a lattice of cells at even (x, y), with the
+odd rows and columns between them as walls. Even sized mazes are padded by
+repeating the last row and column of the lattice.
+"""
+
+import random
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from maze.basic_maze import Maze
+from maze.cells import CellValues, NumpyCellArray
+
+ROAD = CellValues.ROAD.value
+BLOCK = CellValues.BLOCK.value
+
+
+def _rng(seed: Optional[int]) -> random.Random:
+    """A generator seeded with seed, or the random module itself when seed is
+    None, so random.seed also fixes the maze."""
+    return random if seed is None else random.Random(seed)
+
+
+def _numpy_rng(rng: random.Random) -> np.random.Generator:
+    return np.random.default_rng(rng.getrandbits(64))
+
+
+def _lattice_size(num_rows: int, num_cols: int) -> Tuple[int, int]:
+    """Number of rows and columns of lattice cells that fit in the maze."""
+    if num_rows < 1 or num_cols < 1:
+        raise RuntimeError(f"Cannot generate a maze of size {num_rows}x{num_cols}")
+    return (num_rows + 1) // 2, (num_cols + 1) // 2
+
+
+def _lattice_edges(cell_rows: int, cell_cols: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Every pair of neighbouring lattice cells, as flat cell ids."""
+    ids = np.arange(cell_rows * cell_cols, dtype=np.int64).reshape(cell_rows, cell_cols)
+    first = np.concatenate((ids[:, :-1].ravel(), ids[:-1, :].ravel()))
+    second = np.concatenate((ids[:, 1:].ravel(), ids[1:, :].ravel()))
+    return first, second
+
+
+def _carve(
+    num_rows: int,
+    num_cols: int,
+    cell_cols: int,
+    first: np.ndarray,
+    second: np.ndarray,
+) -> Maze:
+    """Build a maze from the lattice edges to open, every cell is a road."""
+    cell_rows = (num_rows + 1) // 2
+    lattice = np.full((cell_rows * 2 - 1, cell_cols * 2 - 1), BLOCK, dtype=np.uint8)
+    lattice[::2, ::2] = ROAD
+
+    first_y, first_x = np.divmod(np.asarray(first, dtype=np.int64), cell_cols)
+    second_y, second_x = np.divmod(np.asarray(second, dtype=np.int64), cell_cols)
+    lattice[first_y + second_y, first_x + second_x] = ROAD
+
+    pad_rows = num_rows - lattice.shape[0]
+    pad_cols = num_cols - lattice.shape[1]
+    grid = np.pad(lattice, ((0, pad_rows), (0, pad_cols)), mode="edge")
+    return Maze.from_cell_array(NumpyCellArray(grid))
+
+
+def recursive_backtracker(num_rows: int, num_cols: int, seed: Optional[int] = None) -> Maze:
+    """Perfect maze (exactly one route between any two cells) carved by an
+    iterative depth first search, giving long winding corridors."""
+    rng = _rng(seed)
+    cell_rows, cell_cols = _lattice_size(num_rows, num_cols)
+    last_row = (cell_rows - 1) * cell_cols
+
+    visited = bytearray(cell_rows * cell_cols)
+    visited[0] = 1
+    first: List[int] = []
+    second: List[int] = []
+
+    stack = [0]
+    while stack:
+        cell = stack[-1]
+        x = cell % cell_cols
+        options = []
+        if cell >= cell_cols and not visited[cell - cell_cols]:
+            options.append(cell - cell_cols)
+        if cell < last_row and not visited[cell + cell_cols]:
+            options.append(cell + cell_cols)
+        if x > 0 and not visited[cell - 1]:
+            options.append(cell - 1)
+        if x < cell_cols - 1 and not visited[cell + 1]:
+            options.append(cell + 1)
+
+        if not options:
+            stack.pop()
+            continue
+
+        new_cell = options[rng.randrange(len(options))] if len(options) > 1 else options[0]
+        visited[new_cell] = 1
+        first.append(cell)
+        second.append(new_cell)
+        stack.append(new_cell)
+
+    return _carve(num_rows, num_cols, cell_cols, first, second)
+
+
+def kruskal(num_rows: int, num_cols: int, seed: Optional[int] = None) -> Maze:
+    """Perfect maze from a random spanning tree built with Kruskal's algorithm,
+    giving many short dead ends."""
+    rng = _rng(seed)
+    cell_rows, cell_cols = _lattice_size(num_rows, num_cols)
+    num_cells = cell_rows * cell_cols
+
+    first, second = _lattice_edges(cell_rows, cell_cols)
+    order = _numpy_rng(rng).permutation(len(first))
+    first = first[order]
+    second = second[order]
+
+    return _carve(num_rows, num_cols, cell_cols, *_spanning_tree(num_cells, first, second))
+
+
+def _spanning_tree(
+    num_cells: int, first: np.ndarray, second: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """The edges Kruskal's algorithm keeps, taking them in the given order.
+
+    Found with Borůvka's algorithm instead, as it runs in a few whole array
+    rounds: each component joins the component across its first edge in the
+    order. With every edge at a different position both give the same tree.
+    """
+    accepted = np.zeros(len(first), dtype=bool)
+    # Edges between different components, in order, and the components at
+    # either end of them. Components are renumbered from 0 every round.
+    active = np.arange(len(first), dtype=np.int64)
+    a, b = first, second
+    num_components = num_cells
+    while True:
+        crossing = a != b
+        active, a, b = active[crossing], a[crossing], b[crossing]
+        if not len(active):
+            break
+
+        # Position in active of the first edge of each component
+        positions = np.arange(len(active), dtype=np.int64)
+        best = np.full(num_components, len(active), dtype=np.int64)
+        np.minimum.at(best, a, positions)
+        np.minimum.at(best, b, positions)
+        components = np.flatnonzero(best < len(active))
+        best = best[components]
+        accepted[active[best]] = True
+
+        # Point each component at the one across its edge. Two components
+        # that chose the same edge point at each other, the smaller becomes
+        # the root. Then follow the pointers to the roots.
+        ids = np.arange(num_components, dtype=np.int64)
+        pointers = ids.copy()
+        pointers[components] = np.where(a[best] == components, b[best], a[best])
+        roots = (pointers[pointers] == ids) & (pointers > ids)
+        pointers[roots] = ids[roots]
+        while True:
+            jumped = pointers[pointers]
+            if np.array_equal(jumped, pointers):
+                break
+            pointers = jumped
+
+        roots = pointers == ids
+        renumber = (np.cumsum(roots) - 1)[pointers]
+        a, b = renumber[a], renumber[b]
+        num_components = int(np.count_nonzero(roots))
+
+    return first[accepted], second[accepted]
+
+
+def prim(num_rows: int, num_cols: int, seed: Optional[int] = None) -> Maze:
+    """Perfect maze grown outwards from the top left like randomised Prim's
+    algorithm, giving short branching corridors.
+
+    Instead of one random wall at a time, each round every cell on the
+    frontier joins with probability one half, through a random neighbour
+    already in the maze, so the growth runs in whole array rounds.
+    """
+    np_rng = _numpy_rng(_rng(seed))
+    cell_rows, cell_cols = _lattice_size(num_rows, num_cols)
+    num_cells = cell_rows * cell_cols
+
+    def neighbours(cells):
+        """The four neighbours of each cell and whether they are inside the
+        lattice, neighbours outside it are replaced by cell 0."""
+        y, x = np.divmod(cells, cell_cols)
+        inside = np.stack((y > 0, y < cell_rows - 1, x > 0, x < cell_cols - 1), axis=1)
+        offsets = np.array([-cell_cols, cell_cols, -1, 1], dtype=np.int64)
+        return np.where(inside, cells[:, None] + offsets, 0), inside
+
+    in_maze = np.zeros(num_cells, dtype=bool)
+    # Cells in the maze or on the frontier
+    reached = np.zeros(num_cells, dtype=bool)
+    in_maze[0] = reached[0] = True
+    cells, inside = neighbours(np.zeros(1, dtype=np.int64))
+    frontier = cells[inside]
+    reached[frontier] = True
+
+    first = [np.zeros(0, dtype=np.int64)]
+    second = [np.zeros(0, dtype=np.int64)]
+    while len(frontier):
+        joins = np_rng.random(len(frontier)) < 0.5
+        joining, frontier = frontier[joins], frontier[~joins]
+
+        # Every frontier cell has a neighbour in the maze, pick one at random
+        cells, inside = neighbours(joining)
+        scores = np.where(inside & in_maze[cells], np_rng.random(cells.shape), -1.0)
+        first.append(cells[np.arange(len(joining)), scores.argmax(axis=1)])
+        second.append(joining)
+        in_maze[joining] = True
+
+        new_cells = np.unique(cells[inside & ~reached[cells]])
+        reached[new_cells] = True
+        frontier = np.concatenate((frontier, new_cells))
+
+    return _carve(num_rows, num_cols, cell_cols, np.concatenate(first), np.concatenate(second))
+
+
+def open_rooms(
+    num_rows: int, num_cols: int, room_size: int = 20, seed: Optional[int] = None
+) -> Maze:
+    """Large open rooms separated by one cell walls, with one random doorway
+    between every pair of neighbouring rooms."""
+    rng = _rng(seed)
+    grid = np.full((num_rows, num_cols), ROAD, dtype=np.uint8)
+
+    wall_rows = list(range(room_size, num_rows - 1, room_size + 1))
+    wall_cols = list(range(room_size, num_cols - 1, room_size + 1))
+    grid[wall_rows, :] = BLOCK
+    grid[:, wall_cols] = BLOCK
+
+    row_edges = [0] + [x + 1 for x in wall_rows] + [num_rows + 1]
+    col_edges = [0] + [x + 1 for x in wall_cols] + [num_cols + 1]
+    for wall in wall_rows:
+        for left, right in zip(col_edges[:-1], col_edges[1:]):
+            grid[wall, rng.randrange(left, right - 1)] = ROAD
+    for wall in wall_cols:
+        for top, bottom in zip(row_edges[:-1], row_edges[1:]):
+            grid[rng.randrange(top, bottom - 1), wall] = ROAD
+
+    return Maze.from_cell_array(NumpyCellArray(grid))
+
+
+def random_obstacles(
+    num_rows: int, num_cols: int, density: float = 0.3, seed: Optional[int] = None
+) -> Maze:
+    """Random fill, blocks placed independently with the given density, plus
+    a random monotone path from the top left to the bottom right so the
+    corners are always connected."""
+    rng = _rng(seed)
+    np_rng = _numpy_rng(rng)
+    grid = np.where(np_rng.random((num_rows, num_cols)) < density, BLOCK, ROAD)
+    grid = grid.astype(np.uint8)
+
+    moves = np.zeros(num_rows + num_cols - 2, dtype=bool)
+    moves[: num_rows - 1] = True
+    np_rng.shuffle(moves)
+    path_y = np.concatenate(([0], np.cumsum(moves)))
+    path_x = np.concatenate(([0], np.cumsum(~moves)))
+    grid[path_y, path_x] = ROAD
+
+    return Maze.from_cell_array(NumpyCellArray(grid))
+
+
+def random_costs(maze: Maze, max_cost: int = 9, seed: Optional[int] = None) -> Maze:
+    """Give every cell of the maze a random cost from 1 to max_cost, in place,
+    and return the maze."""
+    np_rng = _numpy_rng(_rng(seed))
+    maze.set_costs(np_rng.integers(1, max_cost + 1, size=(maze.num_rows, maze.num_cols)))
+    return maze
+
+
+def weighted_obstacles(
+    num_rows: int, num_cols: int, max_cost: int = 9, seed: Optional[int] = None
+) -> Maze:
+    """random_obstacles with random cell costs from 1 to max_cost."""
+    return random_costs(random_obstacles(num_rows, num_cols, seed=seed), max_cost, seed)
+
+
+def main():
+    maze = kruskal(11, 21, seed=1)
+    maze.plot()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from maze.cells import Coords, Moves, interned_coords
+
+
+class RoadGraph:
+    """Compact adjacency index of a maze in CSR form.
+
+    Cells are identified by their flat id, y * num_cols + x. The road cells
+    adjacent to cell i are indices[indptr[i]:indptr[i + 1]], in the same order
+    as Moves.ALL. Every cell has an entry, including blocks and paths, so the
+    roads next to any in bounds cell can be looked up.
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, num_rows: int, num_cols: int):
+        self.indptr = indptr
+        self.indices = indices
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.coords_cache = interned_coords(num_rows, num_cols)
+
+    @classmethod
+    def from_road_mask(cls, road_mask: np.ndarray):
+        num_rows, num_cols = road_mask.shape
+        num_cells = num_rows * num_cols
+        id_dtype = np.int32 if num_cells < 2**31 else np.int64
+
+        is_edge = np.zeros((num_rows, num_cols, len(Moves.ALL)), dtype=bool)
+        for i, move in enumerate(Moves.ALL):
+            # Slice of source cells whose neighbour (y + move.y, x + move.x)
+            # is in bounds, and the matching slice of neighbour cells
+            src_y = slice(max(0, -move.y), num_rows - max(0, move.y))
+            src_x = slice(max(0, -move.x), num_cols - max(0, move.x))
+            dst_y = slice(max(0, move.y), num_rows - max(0, -move.y))
+            dst_x = slice(max(0, move.x), num_cols - max(0, -move.x))
+            is_edge[src_y, src_x, i] = road_mask[dst_y, dst_x]
+
+        offsets = np.array([move.y * num_cols + move.x for move in Moves.ALL], dtype=id_dtype)
+        is_edge = is_edge.reshape(num_cells, len(Moves.ALL))
+        rows, moves = np.nonzero(is_edge)
+        indices = (rows + offsets[moves]).astype(id_dtype)
+
+        indptr = np.zeros(num_cells + 1, dtype=np.int64)
+        np.cumsum(is_edge.sum(axis=1), out=indptr[1:])
+        return cls(indptr, indices, num_rows, num_cols)
+
+    @property
+    def num_cells(self) -> int:
+        return self.num_rows * self.num_cols
+
+    def flat_id(self, coords: Coords) -> int:
+        return coords.y * self.num_cols + coords.x
+
+    def coords(self, flat_id: int) -> Coords:
+        return self.coords_cache[int(flat_id)]
+
+    def neighbour_ids(self, flat_id: int) -> np.ndarray:
+        """Return the flat ids of the roads adjacent to a cell."""
+        return self.indices[self.indptr[flat_id] : self.indptr[flat_id + 1]]
+
+    def neighbours(self, coords: Coords) -> Tuple[Coords]:
+        """Return the coords of the roads adjacent to a cell."""
+        return tuple(self.coords(x) for x in self.neighbour_ids(self.flat_id(coords)))
+
+
+class PaddedGrid:
+    """Flat byte grid of the roads with a one cell border of blocks.
+
+    Cell ids index into roads, id = (y + 1) * width + (x + 1). The border means
+    neighbours can be found by adding one of the offsets without any bounds
+    checks, which keeps pure Python search loops tight.
+    """
+
+    def __init__(self, roads: bytearray, num_rows: int, num_cols: int):
+        self.roads = roads
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.width = num_cols + 2
+        # Same order as Moves.ALL
+        self.offsets = tuple(move.y * self.width + move.x for move in Moves.ALL)
+        self.coords_cache = interned_coords(num_rows, num_cols)
+
+    @classmethod
+    def from_road_mask(cls, road_mask: np.ndarray):
+        num_rows, num_cols = road_mask.shape
+        padded = np.pad(road_mask.astype(np.uint8), 1, constant_values=0)
+        return cls(bytearray(padded.tobytes()), num_rows, num_cols)
+
+    @property
+    def size(self) -> int:
+        return len(self.roads)
+
+    def index(self, coords: Coords) -> int:
+        return (coords.y + 1) * self.width + coords.x + 1
+
+    def coords(self, index: int) -> Coords:
+        y, x = divmod(index, self.width)
+        return self.coords_cache.get(x - 1, y - 1)
+
+    def to_path(self, indices) -> Tuple[Coords]:
+        """Convert a sequence of cell ids to a path of Coords."""
+        return tuple(self.coords(i) for i in indices)
+
+    def unpadded_ids(self, indices: np.ndarray) -> np.ndarray:
+        """Convert cell ids to flat ids of the unpadded grid, y * num_cols + x."""
+        y, x = np.divmod(indices, self.width)
+        return (y - 1) * self.num_cols + (x - 1)
+
+
+def label_components(road_mask: np.ndarray) -> np.ndarray:
+    """Label the connected road cells of a maze, 0 for cells that are not
+    roads and 1 upwards for each group of connected roads.
+
+    A vectorized union-find: each round hooks the larger of two roots joined
+    by an edge onto the smaller, then points every cell straight at its root.
+    The number of roots at least roughly halves each round.
+    """
+    num_rows, num_cols = road_mask.shape
+    is_road = road_mask.reshape(-1)
+    cell_ids = np.arange(is_road.size, dtype=np.int64).reshape(road_mask.shape)
+
+    horizontal = road_mask[:, :-1] & road_mask[:, 1:]
+    vertical = road_mask[:-1, :] & road_mask[1:, :]
+    edge_a = np.concatenate([cell_ids[:, :-1][horizontal], cell_ids[:-1, :][vertical]])
+    edge_b = np.concatenate([cell_ids[:, 1:][horizontal], cell_ids[1:, :][vertical]])
+
+    parents = cell_ids.reshape(-1).copy()
+    while True:
+        root_a = parents[edge_a]
+        root_b = parents[edge_b]
+        differ = root_a != root_b
+        if not differ.any():
+            break
+        # Edges whose ends are already joined never split again
+        edge_a, edge_b = edge_a[differ], edge_b[differ]
+        root_a, root_b = root_a[differ], root_b[differ]
+        np.minimum.at(parents, np.maximum(root_a, root_b), np.minimum(root_a, root_b))
+        while True:
+            grandparents = parents[parents]
+            if np.array_equal(grandparents, parents):
+                break
+            parents = grandparents
+
+    labels = np.zeros(is_road.size, dtype=np.int32)
+    _, inverse = np.unique(parents[is_road], return_inverse=True)
+    labels[is_road] = inverse + 1
+    return labels.reshape(road_mask.shape)
+
+
+def dead_end_mask(road_mask: np.ndarray, keep: Sequence[Coords] = ()) -> np.ndarray:
+    """Return a boolean array of the roads that only lead to dead ends.
+
+    Dead-end filling: roads with at most one road neighbour are filled, which
+    may leave their neighbour a dead end in turn, until none are left. The
+    cells in keep, e.g. the start and end, are never filled, so a path between
+    them never goes through a filled cell.
+    """
+    grid = PaddedGrid.from_road_mask(road_mask)
+    roads = grid.roads
+    offsets = grid.offsets
+
+    padded = np.frombuffer(roads, dtype=np.uint8).astype(np.int8)
+    degrees = sum(np.roll(padded, -offset) for offset in offsets) * padded
+    kept = {grid.index(coords) for coords in keep}
+
+    degrees = degrees.tolist()
+    pending = np.flatnonzero(padded & (np.array(degrees) <= 1)).tolist()
+    filled = []
+    while pending:
+        node = pending.pop()
+        if not roads[node] or node in kept:
+            continue
+        roads[node] = 0
+        filled.append(node)
+        for offset in offsets:
+            neighbour = node + offset
+            if roads[neighbour]:
+                degrees[neighbour] -= 1
+                if degrees[neighbour] <= 1:
+                    pending.append(neighbour)
+
+    mask = np.zeros(road_mask.size, dtype=bool)
+    mask[grid.unpadded_ids(np.array(filled, dtype=np.int64))] = True
+    return mask.reshape(road_mask.shape)
@@ -1,20 +1,252 @@
-import pandas as pd
+import gzip
+import os
+import struct
+from typing import NamedTuple, Optional
+
+import numpy as np
 
 
 class ExcelToIterablesMixin:
     
     @classmethod
     def load_from_excel(cls, file_path, sheet_name=None):
+        # Imported here as pandas is slow to import and only needed for Excel
+        import pandas as pd
         
         if sheet_name:
             df = pd.read_excel(file_path, header=None, sheet_name=sheet_name)
         else:
             df = pd.read_excel(file_path, header=None)
         
+        return cls._dataframe_to_rows(df)
+
+    @classmethod
+    def load_all_from_excel_sheets(cls, file_path):
+        """Return the rows of every sheet, keyed by sheet name, opening the
+        workbook once."""
+        import pandas as pd
+
+        dfs = pd.read_excel(file_path, header=None, sheet_name=None)
+        return {sheet_name: cls._dataframe_to_rows(df) for sheet_name, df in dfs.items()}
+
+    @staticmethod
+    def _dataframe_to_rows(df):
         col_lists = [list(x.values()) for x in df.to_dict().values()]
         row_lists = list(zip(*col_lists))
         return row_lists
-        
+
+    @classmethod
+    def excel_sheet_names(cls, file_path):
+        import pandas as pd
+
+        with pd.ExcelFile(file_path) as excel_file:
+            return list(excel_file.sheet_names)
+
+
+# Maps each byte of a text maze to its symbol, 255 for bytes that are not one
+_TEXT_SYMBOLS = np.full(256, 255, dtype=np.uint8)
+_TEXT_SYMBOLS[np.frombuffer(b"0123456789", dtype=np.uint8)] = np.arange(10)
+_TEXT_SYMBOLS[[ord("."), ord("#")]] = 0, 1
+
+
+class TextToIterablesMixin:
+    """Streaming loader for text mazes, one row per line, in any of:
+
+    - csv: comma separated symbols, e.g. 0,1,0
+    - text: symbols with or without whitespace between them, e.g. 0 1 0 or 010
+    - ascii: # for blocks and . for roads, e.g. .#.
+
+    The format is detected from the first row unless given. Files ending in
+    .gz (or starting with the gzip magic bytes) are decompressed as they are
+    read. Rows are parsed one at a time into a preallocated uint8 buffer that
+    grows geometrically, and row lengths are checked as they are read.
+    """
+
+    TEXT_FORMATS = ("csv", "text", "ascii")
+    INITIAL_TEXT_ROWS = 1024
+
+    @staticmethod
+    def is_gzip_file(file_path) -> bool:
+        with open(file_path, "rb") as f:
+            return f.read(2) == b"\x1f\x8b"
+
+    @classmethod
+    def detect_text_format(cls, row: bytes) -> str:
+        if b"," in row:
+            return "csv"
+        if b"#" in row or b"." in row:
+            return "ascii"
+        return "text"
+
+    @classmethod
+    def parse_text_row(cls, row: bytes, text_format: str) -> np.ndarray:
+        """Return the symbols in one row of a text maze."""
+        if text_format == "csv":
+            fields = row.split(b",")
+            symbols = b"".join(field.strip() for field in fields)
+            num_fields = len(fields)
+        elif text_format == "text":
+            fields = row.split()
+            symbols = b"".join(fields)
+            # Rows with no whitespace have one symbol per character
+            num_fields = len(fields) if len(fields) > 1 else len(symbols)
+        elif text_format == "ascii":
+            symbols = row.strip()
+            num_fields = len(symbols)
+        else:
+            raise RuntimeError(
+                f"Unknown text format {text_format}, expected one of {cls.TEXT_FORMATS}"
+            )
+
+        values = _TEXT_SYMBOLS[np.frombuffer(symbols, dtype=np.uint8)]
+        if len(values) != num_fields or (values == 255).any():
+            raise RuntimeError(f"Cannot parse row {row!r} as {text_format}")
+        return values
+
+    @classmethod
+    def load_from_text(cls, file_path, text_format: Optional[str] = None) -> np.ndarray:
+        """Return a (rows, cols) uint8 array of the symbols in a text maze."""
+        is_gzip = cls.is_gzip_file(file_path)
+        buffer = None
+        num_rows = 0
+        with (gzip.open if is_gzip else open)(file_path, "rb") as f:
+            for line in f:
+                row = line.rstrip(b"\r\n")
+                if not row.strip():
+                    continue
+
+                if buffer is None:
+                    text_format = text_format or cls.detect_text_format(row)
+                    values = cls.parse_text_row(row, text_format)
+                    num_cols = len(values)
+                    # For plain files the first line gives a good estimate
+                    # of the number of rows
+                    if is_gzip:
+                        estimate = cls.INITIAL_TEXT_ROWS
+                    else:
+                        estimate = os.path.getsize(file_path) // len(line) + 1
+                    buffer = np.empty((estimate, num_cols), dtype=np.uint8)
+                else:
+                    values = cls.parse_text_row(row, text_format)
+                    if len(values) != num_cols:
+                        raise RuntimeError(
+                            f"Expected equal length rows, instead row {num_rows} has "
+                            f"length {len(values)} rather than {num_cols}"
+                        )
+
+                if num_rows == len(buffer):
+                    buffer.resize((len(buffer) * 2, num_cols), refcheck=False)
+                buffer[num_rows] = values
+                num_rows += 1
+
+        if buffer is None:
+            raise RuntimeError(f"No rows found in {file_path}")
+        buffer.resize((num_rows, num_cols), refcheck=False)
+        return buffer
+
+
+class BinaryHeader(NamedTuple):
+    encoding: int
+    road_symbol: int
+    block_symbol: int
+    num_rows: int
+    num_cols: int
+
+
+class BinaryMazeMixin:
+    """Compact on-disk maze format.
+
+    A 32 byte header (magic, version, encoding, the road and block symbols of
+    the source and the dimensions) followed by the sanitized cell values,
+    either one uint8 per cell or bit-packed rows for mazes of only roads and
+    blocks. Uncompressed files can be memory-mapped so opening them does not
+    read the cells at all.
+    """
+
+    BINARY_MAGIC = b"MAZE"
+    BINARY_VERSION = 1
+    BINARY_HEADER = struct.Struct("<4sBBBBII")
+    BINARY_HEADER_SIZE = 32
+    ENCODING_UINT8 = 0
+    ENCODING_PACKED = 1
+
+    @classmethod
+    def save_to_binary(
+        cls,
+        file_path,
+        grid: np.ndarray,
+        road_symbol: int = 0,
+        block_symbol: int = 1,
+        packed: bool = False,
+    ):
+        grid = np.ascontiguousarray(grid, dtype=np.uint8)
+        if packed:
+            if grid.size and grid.max() > 1:
+                raise RuntimeError("Only mazes of roads and blocks can be bit-packed.")
+            data = np.packbits(grid, axis=1)
+            encoding = cls.ENCODING_PACKED
+        else:
+            data = grid
+            encoding = cls.ENCODING_UINT8
+
+        header = cls.BINARY_HEADER.pack(
+            cls.BINARY_MAGIC,
+            cls.BINARY_VERSION,
+            encoding,
+            road_symbol,
+            block_symbol,
+            grid.shape[0],
+            grid.shape[1],
+        )
+        with open(file_path, "wb") as f:
+            f.write(header.ljust(cls.BINARY_HEADER_SIZE, b"\0"))
+            f.write(data.tobytes())
+
+    @classmethod
+    def read_binary_header(cls, file_path) -> BinaryHeader:
+        with open(file_path, "rb") as f:
+            raw = f.read(cls.BINARY_HEADER_SIZE)
+        if len(raw) < cls.BINARY_HEADER_SIZE:
+            raise RuntimeError(f"File {file_path} is too short to be a binary maze.")
+
+        magic, version, *fields = cls.BINARY_HEADER.unpack_from(raw)
+        if magic != cls.BINARY_MAGIC:
+            raise RuntimeError(f"File {file_path} is not a binary maze.")
+        if version != cls.BINARY_VERSION:
+            raise RuntimeError(f"Cannot read binary maze version {version}.")
+        return BinaryHeader(*fields)
+
+    @classmethod
+    def load_from_binary(cls, file_path, mmap: bool = True):
+        """Return the header and a (rows, cols) uint8 grid of cell values.
+
+        With mmap the grid of an uint8 file is a copy-on-write memory map:
+        pages are read on first access and changes are never written back.
+        Bit-packed files are always unpacked into memory.
+        """
+        header = cls.read_binary_header(file_path)
+        shape = (header.num_rows, header.num_cols)
+
+        if header.encoding == cls.ENCODING_UINT8:
+            if mmap:
+                grid = np.memmap(
+                    file_path, dtype=np.uint8, mode="c", offset=cls.BINARY_HEADER_SIZE, shape=shape
+                )
+            else:
+                grid = np.fromfile(
+                    file_path, dtype=np.uint8, offset=cls.BINARY_HEADER_SIZE
+                ).reshape(shape)
+        elif header.encoding == cls.ENCODING_PACKED:
+            packed_shape = (header.num_rows, (header.num_cols + 7) // 8)
+            packed = np.fromfile(file_path, dtype=np.uint8, offset=cls.BINARY_HEADER_SIZE)
+            grid = np.unpackbits(
+                packed.reshape(packed_shape), axis=1, count=header.num_cols
+            )
+        else:
+            raise RuntimeError(f"Unknown binary maze encoding {header.encoding}.")
+        return header, grid
+
+
 def main():
     
     excel_loader = ExcelToIterablesMixin()
@@ -0,0 +1,226 @@
+"""
+Optional rendering of mazes with matplotlib.
+
+matplotlib is only imported, and a figure only created, the first time
+something is drawn, so importing the maze package stays cheap and headless.
+"""
+
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from maze.cells import CellValues
+
+MAX_CELL_VALUE = max(x.value for x in CellValues)
+
+
+class MazeRenderer:
+    """Draws grids of cell values with imshow.
+
+    With no output_path frames are shown in an interactive pyplot window.
+    With an output_path matplotlib's Agg canvas is used directly, so no GUI
+    or display is needed, and each frame is saved to output_path. Include
+    {frame} in the path to keep every frame, e.g. "frames/{frame:05d}.png".
+    """
+
+    def __init__(self, output_path: Optional[str] = None, pause: float = 0.005):
+        self.output_path = output_path
+        self.pause = pause
+        self.frame = 0
+        self._figure = None
+        self._axis = None
+
+    @property
+    def is_headless(self) -> bool:
+        return self.output_path is not None
+
+    def is_frame_due(self) -> bool:
+        """Called once per step before building a frame, returns whether the
+        frame should be drawn. Every frame is drawn by default."""
+        return True
+
+    def _ensure_figure(self):
+        if self._figure is not None:
+            return
+        if self.is_headless:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+
+            self._figure = Figure()
+            FigureCanvasAgg(self._figure)
+            self._axis = self._figure.add_subplot()
+        else:
+            from matplotlib import pyplot as plt
+
+            plt.ion()
+            self._figure, self._axis = plt.subplots()
+
+    def draw(self, grid: np.ndarray):
+        self._ensure_figure()
+        self._axis.clear()
+        self._axis.imshow(grid)
+
+        if self.is_headless:
+            self.save(self.output_path.format(frame=self.frame))
+        else:
+            from matplotlib import pyplot as plt
+
+            plt.pause(interval=self.pause)  # type: ignore
+        self.frame += 1
+
+    def draw_view(self, view):
+        """Draw a MazeView, by default by drawing its whole grid."""
+        self.draw(view.grid)
+
+    def save(self, file_path: str):
+        self._ensure_figure()
+        self._figure.savefig(file_path)
+
+    def close(self):
+        if self._figure is not None and not self.is_headless:
+            from matplotlib import pyplot as plt
+
+            plt.close(self._figure)
+        self._figure = None
+        self._axis = None
+
+
+class AnimatedMazeRenderer(MazeRenderer):
+    """Renderer for watching a search step by step.
+
+    One imshow artist is kept and only the cells that changed since the last
+    frame are copied into its buffer. For a MazeView drawn frame after frame
+    these are the cells it pushed or popped, so a frame costs the number of
+    steps since the last one rather than the size of the maze. Steps are
+    batched: a frame is drawn at
+    most every steps_per_frame steps and at most fps times a second, other
+    steps cost only a counter check. With record the changes of every frame
+    are kept so the animation can be exported to a GIF or MP4 afterwards.
+    Set display to False to record without a window or output files.
+    """
+
+    def __init__(
+        self,
+        output_path: Optional[str] = None,
+        fps: Optional[float] = 30,
+        steps_per_frame: int = 1,
+        record: bool = False,
+        display: bool = True,
+        pause: float = 0.001,
+    ):
+        super().__init__(output_path, pause)
+        self.display = display
+        self.fps = fps
+        self.steps_per_frame = steps_per_frame
+        self.record = record
+        self.frames: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._initial_grid = None
+        self._image = None
+        self._buffer = None
+        # The MazeView the buffer was last drawn from, if any
+        self._view = None
+        self._steps = 0
+        self._last_frame_time = 0.0
+
+    @property
+    def is_headless(self) -> bool:
+        return self.output_path is not None or not self.display
+
+    def is_frame_due(self) -> bool:
+        self._steps += 1
+        if self._steps < self.steps_per_frame:
+            return False
+        if self.fps and time.perf_counter() - self._last_frame_time < 1 / self.fps:
+            return False
+        return True
+
+    def draw(self, grid: np.ndarray):
+        self._ensure_figure()
+        self._view = None
+        if self._image is None or self._buffer.shape != grid.shape:
+            self._axis.clear()
+            self._buffer = np.array(grid, dtype=np.uint8)
+            self._image = self._axis.imshow(self._buffer, vmin=0, vmax=MAX_CELL_VALUE)
+            if self.record:
+                self._initial_grid = self._buffer.copy()
+                self.frames = []
+            self._show()
+        else:
+            # A grid on its own has to be compared cell by cell
+            changed = np.flatnonzero(self._buffer.reshape(-1) != grid.reshape(-1))
+            self._update(changed, grid.reshape(-1)[changed])
+
+    def draw_view(self, view):
+        if self._view is view and self._image is not None:
+            self._update(*view.take_changes())
+        else:
+            # Changes are tracked from this frame on
+            view.take_changes()
+            self.draw(view.grid)
+            self._view = view
+
+    def _update(self, changed: np.ndarray, values: np.ndarray):
+        self._buffer.reshape(-1)[changed] = values
+        self._image.set_data(self._buffer)
+        if self.record:
+            self.frames.append((changed, values))
+        self._show()
+
+    def _show(self):
+        if self.is_headless:
+            if self.output_path is not None:
+                self.save(self.output_path.format(frame=self.frame))
+        else:
+            from matplotlib import pyplot as plt
+
+            self._figure.canvas.draw_idle()
+            plt.pause(interval=self.pause)  # type: ignore
+        self.frame += 1
+        self._steps = 0
+        self._last_frame_time = time.perf_counter()
+
+    def close(self):
+        super().close()
+        self._image = None
+        self._buffer = None
+        self._view = None
+
+    def export(self, file_path: str, fps: float = 30):
+        """Replay the recorded frames into a GIF (Pillow) or, for any other
+        extension, a video (ffmpeg). Runs offline on the Agg canvas."""
+        if self._initial_grid is None:
+            raise RuntimeError("Nothing recorded, create the renderer with record=True.")
+
+        from matplotlib.animation import FFMpegWriter, FuncAnimation, PillowWriter
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        figure = Figure()
+        FigureCanvasAgg(figure)
+        axis = figure.add_subplot()
+        buffer = self._initial_grid.copy()
+        image = axis.imshow(buffer, vmin=0, vmax=MAX_CELL_VALUE)
+        flat_buffer = buffer.reshape(-1)
+
+        def update(i):
+            if i > 0:
+                changed, values = self.frames[i - 1]
+                flat_buffer[changed] = values
+                image.set_data(buffer)
+            return (image,)
+
+        animation = FuncAnimation(figure, update, frames=len(self.frames) + 1, blit=False)
+        writer = PillowWriter(fps=fps) if file_path.endswith(".gif") else FFMpegWriter(fps=fps)
+        animation.save(file_path, writer=writer)
+
+
+_DEFAULT_RENDERER: Optional[MazeRenderer] = None
+
+
+def default_renderer() -> MazeRenderer:
+    """The shared interactive renderer used when none is given."""
+    global _DEFAULT_RENDERER
+    if _DEFAULT_RENDERER is None:
+        _DEFAULT_RENDERER = MazeRenderer()
+    return _DEFAULT_RENDERER
@@ -1,11 +1,15 @@
 import random
 import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from dataclasses import dataclass, field
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
 
 from maze.basic_maze import Maze
-from maze.cells import Coords
+from maze.rendering import MazeRenderer
+from maze.cells import CellValues, Coords
+from solvers.instrumentation import NULL_INSTRUMENTS, ProfilerHook, SolverInstruments
 
 
 @dataclass
@@ -14,12 +18,35 @@ class SolverResult:
     is_valid_path: bool
     path_length: int
     solve_time: float
+    seed: Optional[int] = None
+    # Total cost of the cells entered, the number of steps without costs
+    path_cost: Optional[int] = None
+    # Only filled in when the solver is instrumented or profiled
+    counters: Dict[str, int] = field(default_factory=dict)
+    phase_times: Dict[str, float] = field(default_factory=dict)
+    profile: Optional[str] = None
+
+
+class PathCheck(NamedTuple):
+    is_valid: bool
+    # Index into the path of the first invalid step, None for valid paths
+    first_invalid: Optional[int]
+
+
+def _summary_stats(values: Sequence[float]) -> Dict[str, float]:
+    return {
+        "mean": sum(values) / len(values),
+        "min": min(values),
+        "max": max(values),
+    }
 
 
 @dataclass
 class SolverStats:
     solver_class: str
     results_sets: List[SolverResult]
+    # Score paths by their "length" or, for weighted mazes, their "cost"
+    score_by: str = "length"
 
     @property
     def valid_path_results(self) -> Tuple[bool]:
@@ -39,23 +66,39 @@ class SolverStats:
 
     @property
     def length_stats(self):
-        return {
-            "mean": sum(self.path_lengths) / len(self.path_lengths),
-            "min": min(self.path_lengths),
-            "max": max(self.path_lengths),
-        }
+        return _summary_stats(self.path_lengths)
 
     @property
     def length_score(self):
         return sum(self.length_stats.values())
 
+    @property
+    def path_costs(self) -> Tuple[int]:
+        return tuple((res.path_cost for res in self.results_sets))
+
+    @property
+    def cost_stats(self):
+        if None in self.path_costs:
+            return None
+        return _summary_stats(self.path_costs)
+
+    @property
+    def cost_score(self):
+        """None if any result has no path cost."""
+        cost_stats = self.cost_stats
+        return None if cost_stats is None else sum(cost_stats.values())
+
+    @property
+    def path_score(self):
+        if self.score_by == "length":
+            return self.length_score
+        elif self.score_by == "cost":
+            return self.cost_score
+        raise RuntimeError(f"Unknown score_by {self.score_by}, expected length or cost")
+
     @property
     def solve_time_stats(self):
-        return {
-            "mean": sum(self.solve_times) / len(self.solve_times),
-            "min": min(self.solve_times),
-            "max": max(self.solve_times),
-        }
+        return _summary_stats(self.solve_times)
 
     @property
     def timer_score(self):
@@ -64,18 +107,46 @@ class SolverStats:
     @property
     def total_score(self):
         if self.all_paths_valid:
-            return self.length_score + self.timer_score
+            return self.path_score + self.timer_score
         else:
             return None
 
+    @property
+    def counter_stats(self) -> Dict[str, Dict[str, float]]:
+        """Mean, min and max of each instrumentation counter."""
+        names = sorted({name for res in self.results_sets for name in res.counters})
+        return {
+            name: _summary_stats([res.counters.get(name, 0) for res in self.results_sets])
+            for name in names
+        }
+
+    @property
+    def phase_time_stats(self) -> Dict[str, Dict[str, float]]:
+        """Mean, min and max time spent in each instrumented phase."""
+        names = sorted({name for res in self.results_sets for name in res.phase_times})
+        return {
+            name: _summary_stats([res.phase_times.get(name, 0.0) for res in self.results_sets])
+            for name in names
+        }
+
     def __repr__(self) -> str:
-        return (
+        # No total score when any path is invalid, e.g. an unreachable pair
+        total_score = self.total_score
+        total_score = f"{total_score:.2f}" if total_score is not None else "n/a"
+        output = (
             f"Solver stats for class {self.solver_class}: \n"
-            f"Total score for {len(self.results_sets)} tests: {self.total_score:.2f} \n"
+            f"Total score for {len(self.results_sets)} tests: {total_score} \n"
             f"All paths valid results: {self.all_paths_valid}\n"
             f"Path length score ({self.length_score:.2f}): {self.length_stats}\n"
-            f"Solver timing score ({self.timer_score:.2f}): {self.solve_time_stats}"
         )
+        if self.cost_score is not None:
+            output += f"Path cost score ({self.cost_score:.2f}): {self.cost_stats}\n"
+        output += f"Solver timing score ({self.timer_score:.2f}): {self.solve_time_stats}"
+        for name, stats in self.counter_stats.items():
+            output += f"\nCounter {name}: {stats}"
+        for name, stats in self.phase_time_stats.items():
+            output += f"\nPhase {name} time: {stats}"
+        return output
 
 
 class BaseMazeSolver(ABC):
@@ -85,25 +156,45 @@ class BaseMazeSolver(ABC):
         start_coords: Optional[Coords] = None,
         end_coords: Optional[Coords] = None,
         visualize: bool = False,
+        renderer: Optional[MazeRenderer] = None,
+        instrument: bool = False,
+        profiler: Optional[ProfilerHook] = None,
+        starts: Sequence[Coords] = (),
+        ends: Sequence[Coords] = (),
     ):
         # Do not attempt to modify original maze, it is needed for validation
         self.__original_maze = maze
 
         # Do not modify the start and end coordinates either
-        self.start_coords = start_coords or Coords(0, 0)
+        self.start_coords = start_coords or (starts[0] if starts else Coords(0, 0))
         bottom_right = Coords(
             self.original_maze.num_cols - 1, self.original_maze.num_rows - 1
         )
-        self.end_coords = end_coords or bottom_right
+        self.end_coords = end_coords or (ends[0] if ends else bottom_right)
+
+        # For solve_nearest and solve_pairs, solve only uses start_coords and
+        # end_coords. These default to just start_coords and end_coords.
+        self._starts = tuple(dict.fromkeys(starts))
+        self._ends = tuple(dict.fromkeys(ends))
 
         # If you have any plotting, make sure it can be turned on and off using
-        # the visualize attribute below
+        # the visualize attribute below. Nothing is drawn, and matplotlib is
+        # not imported, unless it is True. Pass a renderer with an output path
+        # to draw to files without a display.
         self.visualize = visualize
+        self.renderer = renderer
 
         # If you have any random number generators, use this for the
         # seed to allow for testing with different random number series
         self.rand_seed = 1
 
+        # Counters and phase timers, see solvers.instrumentation. These are
+        # reset at the start of every profile_solve. The profiler, if any, is
+        # run around each profiled solve.
+        self.instrument = instrument
+        self.profiler = profiler
+        self.reset_instruments()
+
         self.validate_start_coords()
         self.validate_end_coords()
 
@@ -115,69 +206,219 @@ class BaseMazeSolver(ABC):
     def original_maze(self, value):
         raise RuntimeError("Do not try and change the original maze.")
 
+    @property
+    def starts(self) -> Tuple[Coords]:
+        return self._starts or (self.start_coords,)
+
+    @property
+    def ends(self) -> Tuple[Coords]:
+        return self._ends or (self.end_coords,)
+
+    @property
+    def is_single_pair(self) -> bool:
+        return len(self.starts) == 1 and len(self.ends) == 1
+
     def validate_start_coords(self):
-        if not self.original_maze.is_valid_road(self.start_coords):
-            raise RuntimeError(
-                f"Start coords {self.start_coords} is not a valid road "
-                f"in maze {self.original_maze}."
-            )
+        for coords in (self.start_coords,) + self.starts:
+            if not self.original_maze.is_valid_road(coords):
+                raise RuntimeError(
+                    f"Start coords {coords} is not a valid road "
+                    f"in maze {self.original_maze}."
+                )
 
     def validate_end_coords(self):
-        if not self.original_maze.is_valid_road(self.end_coords):
-            raise RuntimeError(
-                f"End coords {self.end_coords} is not a valid road "
-                f"in maze {self.original_maze}."
-            )
+        for coords in (self.end_coords,) + self.ends:
+            if not self.original_maze.is_valid_road(coords):
+                raise RuntimeError(
+                    f"End coords {coords} is not a valid road "
+                    f"in maze {self.original_maze}."
+                )
+
+    def is_solvable(self) -> bool:
+        """Is the end reachable from the start, an O(1) lookup once the
+        maze's components are labelled."""
+        return self.original_maze.is_reachable(self.start_coords, self.end_coords)
+
+    def pruned_maze(self) -> Maze:
+        """Copy of the original maze with every dead end that does not hold
+        the start or end filled in. Searches on it find paths that are valid
+        in the original maze without exploring the dead ends."""
+        return self.original_maze.without_dead_ends(keep=(self.start_coords, self.end_coords))
+
+    def reset_instruments(self):
+        self.instruments = SolverInstruments() if self.instrument else NULL_INSTRUMENTS
+
+    def report_steps(self, nodes_expanded: int, neighbour_lookups: int, max_depth: int):
+        """Record the counters of a depth first search once it is done, so
+        the search itself only adds up ints."""
+        instruments = self.instruments
+        instruments.count("nodes_expanded", nodes_expanded)
+        instruments.count("neighbour_lookups", neighbour_lookups)
+        instruments.record_max("max_recursion_depth", max_depth)
+
+    def close(self):
+        """Release anything the solver holds on the maze, e.g. subscriptions
+        to its changes. Nothing by default."""
+
+    def plot(self, maze, final: bool = False):
+        """Draw a Maze or MazeView if visualizing. Renderers may skip
+        intermediate frames, but never the final one."""
+        if self.visualize:
+            maze.plot(self.renderer, force=final)
 
     @abstractmethod
     def solve(self) -> Tuple[Coords]:
         raise NotImplementedError(f"This method must be implemented")
 
-    def profile_solve(self) -> SolverResult:
-        """Profile the solve method for a single run."""
+    def solve_with(self, start_coords: Coords, end_coords: Coords) -> Tuple[Coords]:
+        """Run solve for another start and end, restoring them afterwards."""
+        original_coords = self.start_coords, self.end_coords
+        self.start_coords, self.end_coords = start_coords, end_coords
+        try:
+            return self.solve()
+        finally:
+            self.start_coords, self.end_coords = original_coords
+
+    def solve_nearest(self) -> Tuple[Coords]:
+        """Return the cheapest path from any of starts to any of ends, or ()
+        if none can be reached. Solves every pair by default, subclasses can
+        do this with a single multi-source search."""
+        if self.is_single_pair:
+            return self.solve()
+        paths = [path for path in self.solve_pairs().values() if path]
+        return min(paths, key=self.original_maze.path_cost, default=())
+
+    def solve_pairs(self) -> Dict[Tuple[Coords, Coords], Tuple[Coords]]:
+        """Return a path, () if there is none, for every (start, end) pair of
+        starts and ends. Solves every pair by default."""
+        return {
+            (start, end): self.solve_with(start, end)
+            for start in self.starts
+            for end in self.ends
+        }
+
+    def _profile(self, solve_method):
+        """Run solve_method with visualization off, returning what it returns,
+        the run time and the profiler report."""
         # Turn off visualization and then reapply after solving
         original_vis_setting = self.visualize
         self.visualize = False
 
-        start_time = time.time()
-        path = self.solve()
-        end_time = time.time()
-        run_time = end_time - start_time
+        self.reset_instruments()
+        if self.profiler:
+            self.profiler.start()
+
+        start_time = time.perf_counter()
+        try:
+            solved = solve_method()
+        finally:
+            run_time = time.perf_counter() - start_time
+            profile = self.profiler.stop() if self.profiler else None
+            self.visualize = original_vis_setting
+        return solved, run_time, profile
+
+    def profile_solve(self) -> SolverResult:
+        """Profile the solve method for a single run. With several starts or
+        ends this profiles solve_nearest instead."""
+        path, run_time, profile = self._profile(self.solve_nearest)
 
-        self.visualize = original_vis_setting
+        with self.instruments.phase("validation"):
+            is_valid_path = self.validate_path(path)
 
         solver_result = SolverResult(
             path=path,
-            is_valid_path=self.validate_path(path),
+            is_valid_path=is_valid_path,
             path_length=len(path),
             solve_time=run_time,
+            seed=self.rand_seed,
+            path_cost=self.original_maze.path_cost(path),
+            counters=dict(self.instruments.counters),
+            phase_times=dict(self.instruments.phase_times),
+            profile=profile,
         )
         return solver_result
 
-    def solver_stats(self, n=100):
+    def profile_solve_pairs(self) -> List[SolverResult]:
+        """Profile one run of solve_pairs, with a result for every pair. Each
+        result has the run time, counters and phase times of the whole run."""
+        paths, run_time, profile = self._profile(self.solve_pairs)
+
+        with self.instruments.phase("validation"):
+            checks = [
+                self.check_path(path, (start,), (end,))
+                for (start, end), path in paths.items()
+            ]
+
+        return [
+            SolverResult(
+                path=path,
+                is_valid_path=check.is_valid,
+                path_length=len(path),
+                solve_time=run_time,
+                seed=self.rand_seed,
+                path_cost=self.original_maze.path_cost(path),
+                counters=dict(self.instruments.counters),
+                phase_times=dict(self.instruments.phase_times),
+                profile=profile,
+            )
+            for path, check in zip(paths.values(), checks)
+        ]
+
+    def solver_stats(self, n=100, all_pairs: bool = False, score_by: str = "length"):
+        """Profile n seeded runs. With all_pairs every run profiles solve_pairs
+        and adds a result for each pair. Score by path "length" or "cost"."""
         seeds = [random.randint(1, 1_000_000) for i in range(n)]
 
         results_list = []
 
         for seed in seeds:
-            random.seed(1)
-            solver_results = self.profile_solve()
-            results_list.append(solver_results)
+            self.rand_seed = seed
+            random.seed(seed)
+            if all_pairs:
+                results_list.extend(self.profile_solve_pairs())
+            else:
+                results_list.append(self.profile_solve())
 
         solver_stats = SolverStats(
-            solver_class=self.__class__.__name__, results_sets=results_list
+            solver_class=self.__class__.__name__,
+            results_sets=results_list,
+            score_by=score_by,
         )
         return solver_stats
 
-    def validate_path(self, path: Tuple[Coords]):
-        is_start = path[0] == self.start_coords
-        is_end = path[-1] == self.end_coords
-
-        path_pairs = tuple(zip(path[:-1], path[1:]))
-        is_all_adjacent = all(
-            [self.original_maze.cell_array.is_adjacent(a, b) for a, b in path_pairs]
-        )
-        is_all_road = all([self.original_maze.is_valid_road(x) for x in path])
-
-        return all([is_start, is_end, is_all_adjacent, is_all_road])
+    def validate_path(self, path: Tuple[Coords]) -> bool:
+        return self.check_path(path).is_valid
 
+    def check_path(
+        self,
+        path: Sequence[Coords],
+        starts: Optional[Sequence[Coords]] = None,
+        ends: Optional[Sequence[Coords]] = None,
+    ) -> PathCheck:
+        """Check a path from one of starts to one of ends, by default those of
+        the solver, in O(len(path)) with array operations: every step must be
+        one move from the last and on a road in the original maze. Also
+        returns the index of the first invalid step, the last index if the
+        path does not finish at an end."""
+        starts = self.starts if starts is None else starts
+        ends = self.ends if ends is None else ends
+        if not path:
+            return PathCheck(False, 0)
+
+        num_steps = len(path)
+        xs = np.fromiter((c.x for c in path), dtype=np.intp, count=num_steps)
+        ys = np.fromiter((c.y for c in path), dtype=np.intp, count=num_steps)
+
+        grid = self.original_maze.cell_array.grid
+        num_rows, num_cols = grid.shape
+        is_valid = (xs >= 0) & (xs < num_cols) & (ys >= 0) & (ys < num_rows)
+        is_valid[is_valid] = grid[ys[is_valid], xs[is_valid]] == CellValues.ROAD.value
+        is_valid[1:] &= (np.abs(np.diff(xs)) + np.abs(np.diff(ys))) == 1
+        is_valid[0] &= path[0] in starts
+
+        invalid = np.flatnonzero(~is_valid)
+        if len(invalid):
+            return PathCheck(False, int(invalid[0]))
+        if path[-1] not in ends:
+            return PathCheck(False, num_steps - 1)
+        return PathCheck(True, None)
@@ -0,0 +1,177 @@
+"""
+Score many solvers over many mazes and seeds in parallel.
+
+Each (solver class, maze, seed) trial runs in a worker process. Workers load
+each maze once and keep it for every trial they run on it, then the results
+are merged back into SolverStats per solver and maze.
+"""
+
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple, Type, Union
+
+from maze.basic_maze import Maze
+from maze.cells import Coords
+from solvers.base import BaseMazeSolver, SolverResult, SolverStats
+from solvers.workers import MazeSource, init_worker, worker_maze
+
+
+@dataclass(frozen=True)
+class BenchmarkTrial:
+    solver_class: Type[BaseMazeSolver]
+    maze_name: str
+    seed: int
+    start_coords: Optional[Coords] = None
+    end_coords: Optional[Coords] = None
+
+
+@dataclass
+class BenchmarkReport:
+    # Keyed by (solver class name, maze name)
+    stats: Dict[Tuple[str, str], SolverStats] = field(default_factory=dict)
+    # Whether every repeat of a seed gave the same path
+    determinism: Dict[Tuple[str, str], Dict[int, bool]] = field(default_factory=dict)
+
+    @property
+    def all_deterministic(self) -> bool:
+        return all(all(x.values()) for x in self.determinism.values())
+
+    def total_scores(self) -> Dict[Tuple[str, str], Optional[float]]:
+        return {key: stats.total_score for key, stats in self.stats.items()}
+
+    def __repr__(self) -> str:
+        lines = []
+        for (solver_name, maze_name), stats in self.stats.items():
+            seeds = self.determinism[(solver_name, maze_name)]
+            score = stats.total_score
+            score = f"{score:.2f}" if score is not None else "fail"
+            lines.append(
+                f"{solver_name} on {maze_name}: score {score}, "
+                f"{sum(seeds.values())}/{len(seeds)} seeds deterministic"
+            )
+        return "\n".join(lines)
+
+
+def run_trial(trial: BenchmarkTrial) -> SolverResult:
+    """Run a single seeded solve, in whichever process this is called from."""
+    maze = worker_maze(trial.maze_name)
+    solver = trial.solver_class(
+        maze, start_coords=trial.start_coords, end_coords=trial.end_coords
+    )
+    solver.rand_seed = trial.seed
+    random.seed(trial.seed)
+    try:
+        return solver.profile_solve()
+    finally:
+        # The maze outlives the trial in the worker's cache
+        solver.close()
+
+
+class BenchmarkRunner:
+    """Fan benchmark trials out over a process pool.
+
+    mazes maps a name to either a MazeSource, which each worker loads itself,
+    or an already loaded Maze, which is sent to each worker once.
+    """
+
+    def __init__(
+        self,
+        mazes: Dict[str, Union[MazeSource, Maze]],
+        max_workers: Optional[int] = None,
+        repeats: int = 2,
+    ):
+        if repeats < 1:
+            raise RuntimeError(f"Expected at least one repeat, instead got {repeats}")
+        self.mazes = mazes
+        self.max_workers = max_workers
+        self.repeats = repeats
+
+    def make_trials(
+        self,
+        solver_classes: Sequence[Type[BaseMazeSolver]],
+        seeds: Sequence[int],
+    ) -> List[BenchmarkTrial]:
+        return [
+            BenchmarkTrial(solver_class, maze_name, seed)
+            for solver_class in solver_classes
+            for maze_name in self.mazes
+            for seed in seeds
+            for _ in range(self.repeats)
+        ]
+
+    def run(
+        self,
+        solver_classes: Sequence[Type[BaseMazeSolver]],
+        n: int = 100,
+        seeds: Optional[Sequence[int]] = None,
+    ) -> BenchmarkReport:
+        seeds = seeds or [random.randint(1, 1_000_000) for i in range(n)]
+        trials = self.make_trials(solver_classes, seeds)
+
+        max_workers = self.max_workers or os.cpu_count() or 1
+        chunksize = max(1, len(trials) // (4 * max_workers))
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=init_worker,
+            initargs=(self.mazes,),
+        ) as executor:
+            results = list(executor.map(run_trial, trials, chunksize=chunksize))
+
+        return self.merge(trials, results)
+
+    def run_serial(
+        self,
+        solver_classes: Sequence[Type[BaseMazeSolver]],
+        n: int = 100,
+        seeds: Optional[Sequence[int]] = None,
+    ) -> BenchmarkReport:
+        """Same as run but in this process, useful for debugging solvers."""
+        seeds = seeds or [random.randint(1, 1_000_000) for i in range(n)]
+        trials = self.make_trials(solver_classes, seeds)
+
+        init_worker(self.mazes)
+        results = [run_trial(trial) for trial in trials]
+        return self.merge(trials, results)
+
+    @staticmethod
+    def merge(
+        trials: Sequence[BenchmarkTrial], results: Sequence[SolverResult]
+    ) -> BenchmarkReport:
+        report = BenchmarkReport()
+        paths: Dict[Tuple[str, str], Dict[int, set]] = {}
+
+        for trial, result in zip(trials, results):
+            key = (trial.solver_class.__name__, trial.maze_name)
+            if key not in report.stats:
+                report.stats[key] = SolverStats(solver_class=key[0], results_sets=[])
+                paths[key] = {}
+            report.stats[key].results_sets.append(result)
+            paths[key].setdefault(trial.seed, set()).add(tuple(result.path))
+
+        for key, seed_paths in paths.items():
+            report.determinism[key] = {
+                seed: len(unique_paths) == 1 for seed, unique_paths in seed_paths.items()
+            }
+        return report
+
+
+def main():
+    from solvers.optimal import AStarMazeSolver, BreadthFirstMazeSolver
+    from solvers.simple import PseudoDirectionalMazeSolver
+
+    runner = BenchmarkRunner(
+        mazes={
+            "maze_a": MazeSource("mazes.xlsx", "maze_a"),
+            "maze_b": MazeSource("mazes.xlsx", "maze_b"),
+        }
+    )
+    report = runner.run(
+        [BreadthFirstMazeSolver, AStarMazeSolver, PseudoDirectionalMazeSolver], n=10
+    )
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Scaling benchmark of every solver in the solvers package over seeded,
+generated mazes, with a JSON report that can be diffed against a baseline.
+
+Run from the repository root:
+    python -m solvers.benchmark_suite --output bench.json
+    python -m solvers.benchmark_suite --baseline bench.json
+"""
+
+import argparse
+import importlib
+import inspect
+import json
+import multiprocessing
+import pkgutil
+import platform
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Type
+
+from maze import generators
+from maze.basic_maze import Maze
+from solvers.base import BaseMazeSolver
+
+DEFAULT_SIZES = (10, 50, 100, 500, 1000, 2000, 4000)
+
+MAZE_KINDS: Dict[str, Callable[[int, int, Optional[int]], Maze]] = {
+    "perfect": generators.recursive_backtracker,
+    "rooms": generators.open_rooms,
+    "random": generators.random_obstacles,
+    "kruskal": generators.kruskal,
+    "prim": generators.prim,
+    "weighted": generators.weighted_obstacles,
+}
+DEFAULT_KINDS = ("perfect", "rooms", "random")
+# Kinds whose generator takes a block density, each is run at every density
+DENSITY_KINDS = ("random",)
+DEFAULT_DENSITIES = (0.1, 0.2, 0.3, 0.4)
+
+
+@dataclass(frozen=True)
+class MazeCase:
+    kind: str
+    size: int
+    seed: int = 1
+    # Block density for DENSITY_KINDS, None for the generator's default
+    density: Optional[float] = None
+
+    @property
+    def name(self) -> str:
+        density = "" if self.density is None else f"_density{self.density:g}"
+        return f"{self.kind}{density}_{self.size}x{self.size}_seed{self.seed}"
+
+    def build(self) -> Maze:
+        kwargs = {} if self.density is None else dict(density=self.density)
+        return MAZE_KINDS[self.kind](self.size, self.size, seed=self.seed, **kwargs)
+
+
+@dataclass
+class CaseResult:
+    solver: str
+    maze: str
+    kind: str
+    size: int
+    status: str  # ok, invalid, error, timeout or skipped
+    density: Optional[float] = None
+    wall_time: Optional[float] = None
+    peak_memory: Optional[int] = None
+    nodes_expanded: Optional[int] = None
+    path_length: Optional[int] = None
+    path_cost: Optional[int] = None
+    message: str = ""
+
+    @property
+    def key(self) -> str:
+        return f"{self.solver}/{self.maze}"
+
+
+def discover_solvers() -> List[Type[BaseMazeSolver]]:
+    """Every concrete BaseMazeSolver subclass defined in the solvers package."""
+    import solvers
+
+    for module_info in pkgutil.iter_modules(solvers.__path__):
+        importlib.import_module(f"solvers.{module_info.name}")
+
+    found = []
+    pending = list(BaseMazeSolver.__subclasses__())
+    while pending:
+        solver_class = pending.pop(0)
+        pending.extend(solver_class.__subclasses__())
+        if inspect.isabstract(solver_class) or solver_class in found:
+            continue
+        if solver_class.__module__.startswith("solvers."):
+            found.append(solver_class)
+    return found
+
+
+def _measure(solver_class: Type[BaseMazeSolver], maze: Maze, connection):
+    """Child process body, times one solve then measures the peak memory and
+    counters of another under tracemalloc."""
+    try:
+        maze.invalidate_caches()
+        solver = solver_class(maze)
+        start_time = time.perf_counter()
+        path = solver.solve()
+        wall_time = time.perf_counter() - start_time
+        is_valid = bool(path) and solver.validate_path(path)
+
+        # Counters come from the memory run so the timed run is not instrumented
+        maze.invalidate_caches()
+        solver = solver_class(maze, instrument=True)
+        tracemalloc.start()
+        solver.solve()
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        nodes_expanded = solver.instruments.counters.get("nodes_expanded")
+
+        connection.send(
+            dict(
+                status="ok" if is_valid else "invalid",
+                wall_time=wall_time,
+                peak_memory=peak_memory,
+                nodes_expanded=nodes_expanded,
+                path_length=len(path),
+                path_cost=maze.path_cost(path),
+            )
+        )
+    except Exception as e:
+        connection.send(dict(status="error", message=f"{type(e).__name__}: {e}"))
+    finally:
+        connection.close()
+
+
+class BenchmarkSuite:
+    """Runs every solver on every maze case, each in its own process so a slow
+    or crashing solver can be stopped. Once a solver fails or times out on a
+    maze kind and density, larger sizes of it are skipped for that solver."""
+
+    def __init__(
+        self,
+        solver_classes: Optional[Sequence[Type[BaseMazeSolver]]] = None,
+        sizes: Sequence[int] = DEFAULT_SIZES,
+        kinds: Sequence[str] = DEFAULT_KINDS,
+        seed: int = 1,
+        timeout: float = 60,
+        densities: Sequence[float] = DEFAULT_DENSITIES,
+    ):
+        self.solver_classes = list(solver_classes or discover_solvers())
+        self.cases = [
+            MazeCase(kind, size, seed, density)
+            for kind in kinds
+            for density in (densities if kind in DENSITY_KINDS else (None,))
+            for size in sorted(sizes)
+        ]
+        self.timeout = timeout
+
+    @staticmethod
+    def _new_result(solver_class: Type[BaseMazeSolver], case: MazeCase, status: str) -> CaseResult:
+        return CaseResult(
+            solver_class.__name__, case.name, case.kind, case.size, status, case.density
+        )
+
+    def run_case(self, solver_class: Type[BaseMazeSolver], case: MazeCase, maze: Maze) -> CaseResult:
+        result = self._new_result(solver_class, case, "timeout")
+
+        context = multiprocessing.get_context(
+            "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+        )
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=_measure, args=(solver_class, maze, sender))
+        process.start()
+        sender.close()
+        if receiver.poll(self.timeout):
+            try:
+                for key, value in receiver.recv().items():
+                    setattr(result, key, value)
+            except EOFError:
+                result.status = "error"
+                result.message = f"Process exited with code {process.exitcode}"
+        process.join(timeout=1)
+        if process.is_alive():
+            process.kill()
+            process.join()
+        receiver.close()
+        return result
+
+    def run(self, verbose: bool = True) -> List[CaseResult]:
+        results = []
+        failed = set()
+        for case in self.cases:
+            maze = case.build()
+            for solver_class in self.solver_classes:
+                group = (solver_class, case.kind, case.density)
+                if group in failed:
+                    result = self._new_result(solver_class, case, "skipped")
+                else:
+                    result = self.run_case(solver_class, case, maze)
+                    if result.status in ("error", "timeout", "invalid"):
+                        failed.add(group)
+                results.append(result)
+                if verbose:
+                    print(format_result(result), flush=True)
+        return results
+
+
+def format_result(result: CaseResult) -> str:
+    if result.status != "ok":
+        return f"{result.key}: {result.status} {result.message}".rstrip()
+    return (
+        f"{result.key}: {result.wall_time:.4f}s, "
+        f"{result.peak_memory / 1e6:.1f}MB peak, "
+        f"{result.nodes_expanded} expanded, length {result.path_length}"
+    )
+
+
+def save_results(file_path: str, results: Sequence[CaseResult]):
+    report = dict(
+        created=time.strftime("%Y-%m-%dT%H:%M:%S"),
+        python=platform.python_version(),
+        machine=platform.machine(),
+        results=[asdict(x) for x in results],
+    )
+    with open(file_path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def load_results(file_path: str) -> List[CaseResult]:
+    with open(file_path) as f:
+        report = json.load(f)
+    return [CaseResult(**x) for x in report["results"]]
+
+
+def compare_results(
+    results: Sequence[CaseResult],
+    baseline: Sequence[CaseResult],
+    tolerance: float = 0.2,
+) -> List[str]:
+    """Return a description of every regression against the baseline: a case
+    that stopped passing, got longer or costlier paths, or got slower or used more memory
+    by more than the tolerance."""
+    baseline_by_key = {x.key: x for x in baseline}
+    regressions = []
+    for result in results:
+        old = baseline_by_key.get(result.key)
+        if old is None or old.status != "ok":
+            continue
+        if result.status != "ok":
+            regressions.append(f"{result.key}: was ok, now {result.status}")
+            continue
+        if result.path_length > old.path_length:
+            regressions.append(
+                f"{result.key}: path length {old.path_length} -> {result.path_length}"
+            )
+        if old.path_cost is not None and result.path_cost > old.path_cost:
+            regressions.append(f"{result.key}: path cost {old.path_cost} -> {result.path_cost}")
+        if result.wall_time > old.wall_time * (1 + tolerance):
+            regressions.append(
+                f"{result.key}: wall time {old.wall_time:.4f}s -> {result.wall_time:.4f}s"
+            )
+        if result.peak_memory > old.peak_memory * (1 + tolerance):
+            regressions.append(
+                f"{result.key}: peak memory {old.peak_memory} -> {result.peak_memory}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--kinds", nargs="+", default=DEFAULT_KINDS, choices=list(MAZE_KINDS))
+    parser.add_argument(
+        "--densities",
+        type=float,
+        nargs="+",
+        default=DEFAULT_DENSITIES,
+        help=f"Block densities of the {', '.join(DENSITY_KINDS)} mazes",
+    )
+    parser.add_argument("--solvers", nargs="+", help="Solver class names, defaults to all")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--output", help="Save the results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against results saved with --output")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    solver_classes = discover_solvers()
+    if args.solvers:
+        solver_classes = [x for x in solver_classes if x.__name__ in args.solvers]
+
+    suite = BenchmarkSuite(
+        solver_classes, args.sizes, args.kinds, args.seed, args.timeout, args.densities
+    )
+    results = suite.run()
+
+    if args.output:
+        save_results(args.output, results)
+    if args.baseline:
+        regressions = compare_results(results, load_results(args.baseline), args.tolerance)
+        print(f"{len(regressions)} regressions against {args.baseline}")
+        for regression in regressions:
+            print(f"  {regression}")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Breadth first and A* searches compiled with numba, when it is installed.
+
+The kernels run over the maze's padded grid as a flat uint8 array, see
+PaddedGrid, and fill an array of parents. numba is optional: without it the
+solvers here fall back to the pure Python searches they subclass, so they
+can always be used in place of BreadthFirstMazeSolver and AStarMazeSolver.
+Kernels are compiled on first use and cached on disk by numba.
+"""
+
+import heapq
+
+import numpy as np
+
+from solvers.optimal import AStarMazeSolver, BreadthFirstMazeSolver
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+HAS_NUMBA = numba is not None
+
+
+def _jit(function):
+    if numba is None:
+        return function
+    return numba.njit(cache=True, nogil=True)(function)
+
+
+@_jit
+def bfs_kernel(roads, offsets, start, end, parents):
+    """Breadth first search from start until end, filling parents. Returns
+    the number of nodes expanded and the largest frontier."""
+    queue = np.empty(roads.size, dtype=np.int64)
+    queue[0] = start
+    parents[start] = start
+    head = 0
+    tail = 1
+    max_frontier = 1
+    while head < tail:
+        if tail - head > max_frontier:
+            max_frontier = tail - head
+        node = queue[head]
+        head += 1
+        if node == end:
+            break
+        for offset in offsets:
+            neighbour = node + offset
+            if roads[neighbour] and parents[neighbour] < 0:
+                parents[neighbour] = node
+                queue[tail] = neighbour
+                tail += 1
+    return head, max_frontier
+
+
+@_jit
+def astar_kernel(roads, offsets, width, start, end, parents):
+    """A* with the Manhattan distance from start until end, filling parents.
+    Heap entries are (f, -g, node) as in AStarMazeSolver, so ties on f go to
+    the larger g and the two expand the same nodes. Returns the number of
+    nodes expanded and the largest frontier."""
+    size = roads.size
+    end_y = end // width
+    end_x = end % width
+    costs = np.full(size, -1, dtype=np.int64)
+    costs[start] = 0
+    parents[start] = start
+
+    start_h = abs(start // width - end_y) + abs(start % width - end_x)
+    heap = [(np.int64(start_h), np.int64(0), np.int64(start))]
+    expanded = 0
+    max_frontier = 1
+    while len(heap) > 0:
+        if len(heap) > max_frontier:
+            max_frontier = len(heap)
+        _, neg_cost, node = heapq.heappop(heap)
+        if node == end:
+            expanded += 1
+            break
+        cost = -neg_cost
+        # Skip entries left behind by a cheaper push of the same node
+        if cost > costs[node]:
+            continue
+        expanded += 1
+        new_cost = cost + 1
+        for offset in offsets:
+            neighbour = node + offset
+            if roads[neighbour] and (costs[neighbour] < 0 or new_cost < costs[neighbour]):
+                costs[neighbour] = new_cost
+                parents[neighbour] = node
+                h = abs(neighbour // width - end_y) + abs(neighbour % width - end_x)
+                heapq.heappush(heap, (new_cost + h, -new_cost, neighbour))
+    return expanded, max_frontier
+
+
+@_jit
+def reconstruct_kernel(parents, end):
+    """Walk the parents back from end, returning the cell ids from the start."""
+    length = 1
+    node = end
+    while parents[node] != node:
+        node = parents[node]
+        length += 1
+    path = np.empty(length, dtype=np.int64)
+    node = end
+    for i in range(length - 1, -1, -1):
+        path[i] = node
+        node = parents[node]
+    return path
+
+
+class CompiledBreadthFirstMazeSolver(BreadthFirstMazeSolver):
+    def search(self, grid, start, end):
+        if not HAS_NUMBA:
+            return super().search(grid, start, end)
+
+        roads = np.frombuffer(grid.roads, dtype=np.uint8)
+        offsets = np.array(grid.offsets, dtype=np.int64)
+        parents = np.full(grid.size, -1, dtype=np.int64)
+        expanded, max_frontier = bfs_kernel(roads, offsets, start, end, parents)
+        # The kernels stop on reaching the end before scanning its neighbours
+        found = bool(parents[end] >= 0)
+        self.report(int(expanded), int(max_frontier), int(expanded) - found)
+        if not found:
+            return []
+        return reconstruct_kernel(parents, end).tolist()
+
+
+class CompiledAStarMazeSolver(AStarMazeSolver):
+    def search(self, grid, start, end):
+        if not HAS_NUMBA:
+            return super().search(grid, start, end)
+
+        roads = np.frombuffer(grid.roads, dtype=np.uint8)
+        offsets = np.array(grid.offsets, dtype=np.int64)
+        parents = np.full(grid.size, -1, dtype=np.int64)
+        expanded, max_frontier = astar_kernel(roads, offsets, grid.width, start, end, parents)
+        found = bool(parents[end] >= 0)
+        self.report(int(expanded), int(max_frontier), int(expanded) - found)
+        if not found:
+            return []
+        return reconstruct_kernel(parents, end).tolist()
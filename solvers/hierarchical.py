@@ -0,0 +1,448 @@
+"""
+Hierarchical pathfinding (HPA*) over fixed size clusters of a maze.
+"""
+
+import heapq
+import os
+import tempfile
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from maze.basic_maze import Maze, MazeView
+from maze.cells import Coords
+from maze.graph import PaddedGrid
+from solvers.base import BaseMazeSolver
+
+# Entrances at least this wide get a transition at each end instead of one
+# in the middle
+WIDE_ENTRANCE = 6
+
+_START = -1
+_END = -2
+
+
+class ClusterAbstraction:
+    """Abstract graph of a maze split into cluster_size square clusters.
+
+    Wherever two neighbouring clusters share a run of roads across their
+    border there are one or two transitions, pairs of cells either side of
+    the border one step apart. The cells of the transitions are the nodes of
+    the abstract graph. Nodes in the same cluster are joined by the length of
+    the shortest path between them inside the cluster.
+
+    Nodes are cell ids of the maze's padded grid, see PaddedGrid. Clusters
+    are numbered row by row. A cluster and its neighbours can be rebuilt on
+    their own after cells change.
+    """
+
+    def __init__(self, road_mask: np.ndarray, cluster_size: int = 16):
+        if cluster_size < 2:
+            raise RuntimeError(f"Cluster size must be at least 2, not {cluster_size}")
+        self.road_mask = np.array(road_mask, dtype=bool)
+        self.cluster_size = cluster_size
+        self.num_rows, self.num_cols = self.road_mask.shape
+        self.width = self.num_cols + 2
+        self.cluster_rows = -(-self.num_rows // cluster_size)
+        self.cluster_cols = -(-self.num_cols // cluster_size)
+
+        # Keyed by (cluster, neighbour) with cluster < neighbour, the
+        # transitions as (node in cluster, node in neighbour)
+        self.transitions: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        # Node to the nodes one step away across a border
+        self.inter: Dict[int, List[int]] = {}
+        # Cluster to node to {other node in the cluster: distance}
+        self.intra: Dict[int, Dict[int, Dict[int, int]]] = {}
+        self._cluster_grids: Dict[int, PaddedGrid] = {}
+
+    @property
+    def num_clusters(self) -> int:
+        return self.cluster_rows * self.cluster_cols
+
+    def cluster_of(self, node: int) -> int:
+        y, x = divmod(node, self.width)
+        size = self.cluster_size
+        return (y - 1) // size * self.cluster_cols + (x - 1) // size
+
+    def bounds(self, cluster: int) -> Tuple[int, int, int, int]:
+        """Rows y0 to y1 and columns x0 to x1 (exclusive) of the cluster."""
+        cluster_y, cluster_x = divmod(cluster, self.cluster_cols)
+        size = self.cluster_size
+        y0, x0 = cluster_y * size, cluster_x * size
+        return y0, min(y0 + size, self.num_rows), x0, min(x0 + size, self.num_cols)
+
+    def neighbour_clusters(self, cluster: int) -> List[int]:
+        cluster_y, cluster_x = divmod(cluster, self.cluster_cols)
+        neighbours = []
+        if cluster_y > 0:
+            neighbours.append(cluster - self.cluster_cols)
+        if cluster_y < self.cluster_rows - 1:
+            neighbours.append(cluster + self.cluster_cols)
+        if cluster_x > 0:
+            neighbours.append(cluster - 1)
+        if cluster_x < self.cluster_cols - 1:
+            neighbours.append(cluster + 1)
+        return neighbours
+
+    def borders(self, cluster: int) -> List[Tuple[int, int]]:
+        return [(min(cluster, x), max(cluster, x)) for x in self.neighbour_clusters(cluster)]
+
+    def cluster_nodes(self, cluster: int) -> Dict[int, Dict[int, int]]:
+        return self.intra.get(cluster, {})
+
+    def build(self):
+        for cluster in range(self.num_clusters):
+            for border in self.borders(cluster):
+                if border[0] == cluster:
+                    self._set_transitions(border, self._find_transitions(border))
+        for cluster in range(self.num_clusters):
+            self._build_intra(cluster)
+
+    def update_cells(self, changes: Iterable[Tuple[Coords, bool]]):
+        """Apply (coords, is road) changes, rebuilding only the clusters that
+        hold them and their neighbours."""
+        clusters = set()
+        for coords, is_road in changes:
+            if self.road_mask[coords.y, coords.x] != is_road:
+                self.road_mask[coords.y, coords.x] = is_road
+                clusters.add(self.cluster_of((coords.y + 1) * self.width + coords.x + 1))
+        if clusters:
+            self.rebuild_clusters(clusters)
+
+    def rebuild_clusters(self, clusters: Set[int]):
+        """Recompute the transitions on every border of the clusters, then the
+        distances inside them and their neighbours, whose nodes may have
+        changed with the transitions."""
+        borders = {border for cluster in clusters for border in self.borders(cluster)}
+        for border in borders:
+            self._set_transitions(border, self._find_transitions(border))
+
+        affected = set(clusters)
+        for cluster in clusters:
+            affected.update(self.neighbour_clusters(cluster))
+        for cluster in affected:
+            self._cluster_grids.pop(cluster, None)
+            self._build_intra(cluster)
+
+    def _find_transitions(self, border: Tuple[int, int]) -> List[Tuple[int, int]]:
+        cluster, neighbour = border
+        y0, y1, x0, x1 = self.bounds(cluster)
+        # Compared by row, as with one cluster per row the cluster to the
+        # right and the one below both have id cluster + 1
+        if divmod(cluster, self.cluster_cols)[0] == divmod(neighbour, self.cluster_cols)[0]:
+            # Vertical border between columns x1 - 1 and x1
+            open_cells = self.road_mask[y0:y1, x1 - 1] & self.road_mask[y0:y1, x1]
+            cells = [((y, x1 - 1), (y, x1)) for y in range(y0, y1)]
+        else:
+            # Horizontal border between rows y1 - 1 and y1
+            open_cells = self.road_mask[y1 - 1, x0:x1] & self.road_mask[y1, x0:x1]
+            cells = [((y1 - 1, x), (y1, x)) for x in range(x0, x1)]
+
+        transitions = []
+        for first, last in self._runs(open_cells):
+            if last - first + 1 >= WIDE_ENTRANCE:
+                chosen = (first, last)
+            else:
+                chosen = ((first + last) // 2,)
+            for i in chosen:
+                (ay, ax), (by, bx) = cells[i]
+                transitions.append(
+                    ((ay + 1) * self.width + ax + 1, (by + 1) * self.width + bx + 1)
+                )
+        return transitions
+
+    @staticmethod
+    def _runs(values: np.ndarray) -> List[Tuple[int, int]]:
+        """First and last index of each run of True values."""
+        padded = np.concatenate(([False], values, [False])).astype(np.int8)
+        changes = np.flatnonzero(np.diff(padded))
+        return list(zip(changes[::2].tolist(), (changes[1::2] - 1).tolist()))
+
+    def _set_transitions(self, border: Tuple[int, int], transitions: List[Tuple[int, int]]):
+        for a, b in self.transitions.pop(border, ()):
+            for node, other in ((a, b), (b, a)):
+                partners = self.inter[node]
+                partners.remove(other)
+                if not partners:
+                    del self.inter[node]
+        if transitions:
+            self.transitions[border] = transitions
+        for a, b in transitions:
+            self.inter.setdefault(a, []).append(b)
+            self.inter.setdefault(b, []).append(a)
+
+    def cluster_grid(self, cluster: int) -> PaddedGrid:
+        grid = self._cluster_grids.get(cluster)
+        if grid is None:
+            y0, y1, x0, x1 = self.bounds(cluster)
+            grid = PaddedGrid.from_road_mask(self.road_mask[y0:y1, x0:x1])
+            self._cluster_grids[cluster] = grid
+        return grid
+
+    def to_local(self, cluster: int, node: int) -> int:
+        y0, _, x0, _ = self.bounds(cluster)
+        y, x = divmod(node, self.width)
+        return (y - y0) * self.cluster_grid(cluster).width + x - x0
+
+    def to_global(self, cluster: int, local: int) -> int:
+        y0, _, x0, _ = self.bounds(cluster)
+        y, x = divmod(local, self.cluster_grid(cluster).width)
+        return (y + y0) * self.width + x + x0
+
+    def search_cluster(self, cluster: int, node: int) -> List[int]:
+        """Breadth first search inside the cluster from node, returning the
+        parent of each local cell id, -1 where it is not reached."""
+        grid = self.cluster_grid(cluster)
+        roads = grid.roads
+        offsets = grid.offsets
+        source = self.to_local(cluster, node)
+        parents = [-1] * grid.size
+        parents[source] = source
+        queue = deque((source,))
+        while queue:
+            local = queue.popleft()
+            for offset in offsets:
+                neighbour = local + offset
+                if roads[neighbour] and parents[neighbour] < 0:
+                    parents[neighbour] = local
+                    queue.append(neighbour)
+        return parents
+
+    def cluster_path(self, cluster: int, parents: List[int], node: int) -> List[int]:
+        """Path from the source of search_cluster to node, as global ids."""
+        local = self.to_local(cluster, node)
+        path = [local]
+        while parents[local] != local:
+            local = parents[local]
+            path.append(local)
+        path.reverse()
+        return [self.to_global(cluster, x) for x in path]
+
+    def _build_intra(self, cluster: int):
+        nodes = set()
+        for border in self.borders(cluster):
+            for pair in self.transitions.get(border, ()):
+                nodes.update(x for x in pair if self.cluster_of(x) == cluster)
+        nodes = sorted(nodes)
+        edges = {node: {} for node in nodes}
+        for i, node in enumerate(nodes):
+            parents = self.search_cluster(cluster, node)
+            for other in nodes[i + 1 :]:
+                if parents[self.to_local(cluster, other)] >= 0:
+                    distance = len(self.cluster_path(cluster, parents, other)) - 1
+                    edges[node][other] = distance
+                    edges[other][node] = distance
+        if edges:
+            self.intra[cluster] = edges
+        else:
+            self.intra.pop(cluster, None)
+
+    def find_path(self, start: int, end: int) -> Tuple[List[int], int]:
+        """Return the cell ids of a short path from start to end, or an empty
+        list, and the number of abstract nodes expanded.
+
+        The start and end are joined to the nodes of their clusters, the
+        abstract graph is searched with A*, and each abstract edge of the
+        result is refined into cells by a search inside its cluster.
+        """
+        for node in (start, end):
+            y, x = divmod(node, self.width)
+            if not self.road_mask[y - 1, x - 1]:
+                return [], 0
+        if start == end:
+            return [start], 0
+
+        start_cluster = self.cluster_of(start)
+        end_cluster = self.cluster_of(end)
+        start_parents = self.search_cluster(start_cluster, start)
+        end_parents = self.search_cluster(end_cluster, end)
+
+        def cluster_distances(cluster, parents):
+            distances = {}
+            for node in self.cluster_nodes(cluster):
+                if parents[self.to_local(cluster, node)] >= 0:
+                    distances[node] = len(self.cluster_path(cluster, parents, node)) - 1
+            return distances
+
+        start_edges = cluster_distances(start_cluster, start_parents)
+        end_edges = cluster_distances(end_cluster, end_parents)
+        if start_cluster == end_cluster and start_parents[self.to_local(start_cluster, end)] >= 0:
+            start_edges[_END] = len(self.cluster_path(start_cluster, start_parents, end)) - 1
+
+        width = self.width
+        end_y, end_x = divmod(end, width)
+
+        def heuristic(node):
+            if node == _END:
+                return 0
+            y, x = divmod(start if node == _START else node, width)
+            return abs(x - end_x) + abs(y - end_y)
+
+        costs = {_START: 0}
+        parents = {_START: _START}
+        heap = [(heuristic(_START), 0, _START)]
+        expanded = 0
+        while heap:
+            _, cost, node = heapq.heappop(heap)
+            if cost > costs[node]:
+                continue
+            expanded += 1
+            if node == _END:
+                break
+
+            if node == _START:
+                successors = list(start_edges.items())
+            else:
+                successors = list(self.cluster_nodes(self.cluster_of(node)).get(node, {}).items())
+                successors.extend((x, 1) for x in self.inter.get(node, ()))
+                if node in end_edges:
+                    successors.append((_END, end_edges[node]))
+            for successor, step in successors:
+                new_cost = cost + step
+                if new_cost < costs.get(successor, new_cost + 1):
+                    costs[successor] = new_cost
+                    parents[successor] = node
+                    heapq.heappush(heap, (new_cost + heuristic(successor), new_cost, successor))
+        else:
+            return [], expanded
+
+        abstract_path = [_END]
+        while abstract_path[-1] != _START:
+            abstract_path.append(parents[abstract_path[-1]])
+        abstract_path.reverse()
+        return self.refine(abstract_path, start, end, start_parents, end_parents), expanded
+
+    def refine(self, abstract_path, start, end, start_parents, end_parents) -> List[int]:
+        path = [start]
+        for a, b in zip(abstract_path[:-1], abstract_path[1:]):
+            if a == _START:
+                cluster = self.cluster_of(start)
+                segment = self.cluster_path(cluster, start_parents, end if b == _END else b)
+            elif b == _END:
+                cluster = self.cluster_of(end)
+                segment = self.cluster_path(cluster, end_parents, a)[::-1]
+            elif self.cluster_of(a) == self.cluster_of(b):
+                cluster = self.cluster_of(a)
+                segment = self.cluster_path(cluster, self.search_cluster(cluster, a), b)
+            else:
+                segment = [a, b]
+            path.extend(segment[1:])
+        return path
+
+    def save(self, file_path: str):
+        transitions = [pair for pairs in self.transitions.values() for pair in pairs]
+        intra = [
+            (node, other, distance)
+            for edges in self.intra.values()
+            for node, others in edges.items()
+            for other, distance in others.items()
+            if node < other
+        ]
+        # Written to a temporary file first so readers never see part of it
+        directory = os.path.dirname(os.path.abspath(file_path))
+        fd, temp_path = tempfile.mkstemp(suffix=".npz", dir=directory)
+        with os.fdopen(fd, "wb") as f:
+            np.savez(
+                f,
+                shape=np.array([self.num_rows, self.num_cols, self.cluster_size]),
+                road_mask=np.packbits(self.road_mask, axis=1),
+                transitions=np.array(transitions, dtype=np.int64).reshape(-1, 2),
+                intra=np.array(intra, dtype=np.int64).reshape(-1, 3),
+            )
+        os.replace(temp_path, file_path)
+
+    @classmethod
+    def load(cls, file_path: str) -> "ClusterAbstraction":
+        with np.load(file_path) as data:
+            num_rows, num_cols, cluster_size = data["shape"].tolist()
+            road_mask = np.unpackbits(data["road_mask"], axis=1, count=num_cols).astype(bool)
+            abstraction = cls(road_mask, cluster_size)
+            transitions = data["transitions"].tolist()
+            intra = data["intra"].tolist()
+
+        cluster_of = abstraction.cluster_of
+        by_border = {}
+        for a, b in transitions:
+            border = (cluster_of(a), cluster_of(b))
+            by_border.setdefault(border, []).append((a, b))
+        for border, pairs in by_border.items():
+            abstraction._set_transitions(border, pairs)
+
+        for pair in transitions:
+            for node in pair:
+                abstraction.intra.setdefault(cluster_of(node), {}).setdefault(node, {})
+        for node, other, distance in intra:
+            edges = abstraction.intra[cluster_of(node)]
+            edges[node][other] = distance
+            edges[other][node] = distance
+        return abstraction
+
+
+class HierarchicalMazeSolver(BaseMazeSolver):
+    """HPA* solver for answering many queries on large mazes.
+
+    The cluster abstraction is built once per maze, on the first solve, and
+    reused for every later solve, e.g. through solve_with or solve_pairs.
+    With a cache_dir it is also saved there, keyed by the maze's content hash
+    and the cluster size, and loaded by later solvers of the same maze.
+    Changes to the maze only rebuild the clusters they touch. Paths are
+    valid but may be a little longer than the shortest.
+    """
+
+    def __init__(self, *args, cluster_size: int = 16, cache_dir: Optional[str] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cluster_size = cluster_size
+        self.cache_dir = cache_dir
+        self.abstraction: Optional[ClusterAbstraction] = None
+        self._changed = {}
+        self.original_maze.subscribe(self.on_cells_changed)
+
+    def close(self):
+        self.original_maze.unsubscribe(self.on_cells_changed)
+
+    def on_cells_changed(self, maze: Maze, changed_coords: Tuple[Coords]):
+        for coords in changed_coords:
+            self._changed[coords] = None
+
+    def cache_path(self) -> str:
+        file_name = f"hpa-{self.original_maze.content_hash}-{self.cluster_size}.npz"
+        return os.path.join(self.cache_dir, file_name)
+
+    def load_abstraction(self) -> ClusterAbstraction:
+        """Build, load or update the abstraction for the maze as it is now."""
+        maze = self.original_maze
+        if self.abstraction is None:
+            self._changed.clear()
+            if self.cache_dir and os.path.exists(self.cache_path()):
+                self.abstraction = ClusterAbstraction.load(self.cache_path())
+            else:
+                self.abstraction = ClusterAbstraction(maze.cell_array.road_mask, self.cluster_size)
+                self.abstraction.build()
+                if self.cache_dir:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    self.abstraction.save(self.cache_path())
+        elif self._changed:
+            self.abstraction.update_cells(
+                (coords, maze.is_valid_road(coords)) for coords in self._changed
+            )
+            self._changed.clear()
+        return self.abstraction
+
+    def solve(self):
+        instruments = self.instruments
+        with instruments.phase("setup"):
+            abstraction = self.load_abstraction()
+            grid = self.original_maze.padded_grid
+            start = grid.index(self.start_coords)
+            end = grid.index(self.end_coords)
+
+        with instruments.phase("search"):
+            indices, expanded = abstraction.find_path(start, end)
+        instruments.count("nodes_expanded", expanded)
+
+        with instruments.phase("reconstruction"):
+            path = grid.to_path(indices)
+        if self.visualize and path:
+            self.plot(MazeView(self.original_maze, path), final=True)
+        return path
@@ -0,0 +1,203 @@
+"""
+Incremental replanning with D* Lite for mazes whose cells change over time.
+"""
+
+import heapq
+import math
+from typing import List, Sequence, Tuple
+
+from maze.basic_maze import Maze, MazeView
+from maze.cells import CellValues, Coords
+from solvers.base import BaseMazeSolver
+
+
+class DStarLiteMazeSolver(BaseMazeSolver):
+    """Shortest path solver that keeps its search between solves.
+
+    The search runs back from the end, so g holds the distance of each cell
+    to the end. The solver subscribes to changes of the maze and queues the
+    changed cells. The next solve updates only those cells and their
+    neighbours, then repairs the distances that depend on them (D* Lite).
+    The start may move between solves, e.g. as an agent walks the path, and
+    is handled without a new search. Changing the end starts a new search.
+    The maze holds the subscription weakly, so the solver is freed as usual,
+    call close to stop listening to the maze before then.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._grid = None
+        self._changed = {}
+        self.original_maze.subscribe(self.on_cells_changed)
+
+    def close(self):
+        self.original_maze.unsubscribe(self.on_cells_changed)
+
+    def on_cells_changed(self, maze: Maze, changed_coords: Tuple[Coords]):
+        for coords in changed_coords:
+            self._changed[coords] = None
+
+    def apply_edits(self, edits: Sequence[Tuple[Coords, CellValues]]) -> Tuple[Coords]:
+        """Apply a batch of (coords, value) changes to the maze and return the
+        repaired path."""
+        self.original_maze.set_values(edits)
+        return self.solve()
+
+    def solve(self):
+        instruments = self.instruments
+        with instruments.phase("setup"):
+            grid = self._grid
+            end_changed = grid is None or grid.index(self.end_coords) != self._goal
+            if end_changed:
+                self.initialize()
+            else:
+                self.move_start(self.start_coords)
+                self.update_changed_cells()
+
+        with instruments.phase("search"):
+            self.compute_shortest_path()
+
+        with instruments.phase("reconstruction"):
+            path = self.extract_path()
+        if self.visualize and path:
+            self.plot(MazeView(self.original_maze, path), final=True)
+        return path
+
+    def initialize(self):
+        """Start a new search from the current maze, start and end."""
+        grid = self.original_maze.padded_grid
+        self._grid = grid
+        self._roads = bytearray(grid.roads)
+        self._changed.clear()
+        self._g = [math.inf] * grid.size
+        self._rhs = [math.inf] * grid.size
+        self._queue = []
+        self._queued = {}
+        self._km = 0
+        self._start = grid.index(self.start_coords)
+        self._goal = grid.index(self.end_coords)
+        self.update_vertex(self._goal)
+
+    def move_start(self, coords: Coords):
+        """Move the start, keeping the search. Queued keys stay valid as a
+        lower bound by adding the distance moved to km."""
+        start = self._grid.index(coords)
+        if start != self._start:
+            self._km += self.heuristic(self._start, start)
+            self._start = start
+
+    def update_changed_cells(self):
+        """Copy the queued changes from the maze and update the cells whose
+        shortest distance may depend on them."""
+        cell_array = self.original_maze.cell_array
+        roads = self._roads
+        offsets = self._grid.offsets
+        for coords in self._changed:
+            node = self._grid.index(coords)
+            is_road = cell_array.get_cell_value(coords) == CellValues.ROAD
+            if roads[node] == is_road:
+                continue
+            roads[node] = is_road
+            self.update_vertex(node)
+            for offset in offsets:
+                self.update_vertex(node + offset)
+        self._changed.clear()
+
+    def heuristic(self, a: int, b: int) -> int:
+        width = self._grid.width
+        ay, ax = divmod(a, width)
+        by, bx = divmod(b, width)
+        return abs(ax - bx) + abs(ay - by)
+
+    def key(self, node: int) -> Tuple[float, float]:
+        best = min(self._g[node], self._rhs[node])
+        return best + self.heuristic(self._start, node) + self._km, best
+
+    def update_vertex(self, node: int):
+        """Recompute the one step lookahead distance of node and queue it if
+        it is inconsistent with its distance."""
+        if node == self._goal:
+            rhs = 0 if self._roads[node] else math.inf
+        elif self._roads[node]:
+            g = self._g
+            roads = self._roads
+            neighbours = (node + offset for offset in self._grid.offsets)
+            rhs = min((g[x] for x in neighbours if roads[x]), default=math.inf) + 1
+        else:
+            rhs = math.inf
+        self._rhs[node] = rhs
+
+        if self._g[node] != rhs:
+            key = self.key(node)
+            self._queued[node] = key
+            heapq.heappush(self._queue, (key, node))
+        else:
+            self._queued.pop(node, None)
+
+    def _top_key(self) -> Tuple[float, float]:
+        """Smallest key in the queue, dropping entries that were re-queued or
+        removed since they were pushed."""
+        queue = self._queue
+        queued = self._queued
+        while queue:
+            key, node = queue[0]
+            if queued.get(node) == key:
+                return key
+            heapq.heappop(queue)
+        return math.inf, math.inf
+
+    def compute_shortest_path(self):
+        g = self._g
+        rhs = self._rhs
+        offsets = self._grid.offsets
+        start = self._start
+        expanded = 0
+        max_frontier = len(self._queued)
+
+        while self._top_key() < self.key(start) or rhs[start] != g[start]:
+            if not self._queued:
+                break
+            old_key, node = heapq.heappop(self._queue)
+            new_key = self.key(node)
+            if old_key < new_key:
+                self._queued[node] = new_key
+                heapq.heappush(self._queue, (new_key, node))
+                continue
+
+            expanded += 1
+            del self._queued[node]
+            if g[node] > rhs[node]:
+                g[node] = rhs[node]
+            else:
+                g[node] = math.inf
+                self.update_vertex(node)
+            for offset in offsets:
+                neighbour = node + offset
+                if self._roads[neighbour]:
+                    self.update_vertex(neighbour)
+            max_frontier = max(max_frontier, len(self._queued))
+
+        instruments = self.instruments
+        instruments.count("nodes_expanded", expanded)
+        instruments.count("neighbour_lookups", expanded)
+        instruments.record_max("max_frontier", max_frontier)
+
+    def extract_path(self) -> Tuple[Coords]:
+        """Follow the smallest distances from the start to the end."""
+        g = self._g
+        node = self._start
+        if g[node] == math.inf or not self._roads[node]:
+            return ()
+
+        roads = self._roads
+        offsets = self._grid.offsets
+        path: List[int] = [node]
+        while node != self._goal:
+            node = min(
+                (node + offset for offset in offsets if roads[node + offset]),
+                key=g.__getitem__,
+            )
+            if g[node] == math.inf:
+                return ()
+            path.append(node)
+        return self._grid.to_path(path)
@@ -0,0 +1,102 @@
+"""
+Counters, phase timers and profiling hooks for solvers.
+
+Solvers report through self.instruments. When instrumentation is off this is
+NULL_INSTRUMENTS, whose methods do nothing, so solvers should keep hot loop
+counts in local variables and report them once at the end of a search.
+"""
+
+import cProfile
+import io
+import pstats
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+class SolverInstruments:
+    """Counters and exclusive phase timings for the solves of one solver.
+    Time spent in a nested phase is not counted towards its outer phase."""
+
+    enabled = True
+
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+        self.phase_times: Dict[str, float] = {}
+        self._phases: List[list] = []
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def record_max(self, name: str, value: int):
+        if value > self.counters.get(name, value - 1):
+            self.counters[name] = value
+
+    @contextmanager
+    def phase(self, name: str):
+        now = time.perf_counter()
+        if self._phases:
+            outer_name, outer_start = self._phases[-1]
+            self.phase_times[outer_name] = self.phase_times.get(outer_name, 0.0) + now - outer_start
+        self._phases.append([name, now])
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            _, start = self._phases.pop()
+            self.phase_times[name] = self.phase_times.get(name, 0.0) + now - start
+            if self._phases:
+                self._phases[-1][1] = now
+
+
+class NullInstruments:
+    """Stand in for SolverInstruments when instrumentation is off."""
+
+    enabled = False
+    counters: Dict[str, int] = {}
+    phase_times: Dict[str, float] = {}
+
+    def count(self, name: str, n: int = 1):
+        pass
+
+    def record_max(self, name: str, value: int):
+        pass
+
+    @contextmanager
+    def phase(self, name: str):
+        yield
+
+
+NULL_INSTRUMENTS = NullInstruments()
+
+
+class ProfilerHook:
+    """Interface for profilers run around each profiled solve. stop returns
+    a text report that is stored on the SolverResult."""
+
+    def start(self):
+        raise NotImplementedError("This method must be implemented")
+
+    def stop(self) -> Optional[str]:
+        raise NotImplementedError("This method must be implemented")
+
+
+class CProfileHook(ProfilerHook):
+    """Profile with cProfile, reporting the top functions by sort_by."""
+
+    def __init__(self, sort_by: str = "cumulative", limit: int = 20):
+        self.sort_by = sort_by
+        self.limit = limit
+        self._profile = None
+
+    def start(self):
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def stop(self) -> Optional[str]:
+        self._profile.disable()
+        output = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=output)
+        stats.sort_stats(self.sort_by).print_stats(self.limit)
+        self._profile = None
+        return output.getvalue()
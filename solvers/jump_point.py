@@ -0,0 +1,122 @@
+"""
+Jump Point Search for 4-connected grids.
+
+Shortest paths are searched in a canonical order where vertical segments may
+turn horizontal at any cell, but horizontal segments only turn vertical at a
+forced neighbour (the cell beside the previous cell is blocked while the cell
+beside the current one is open). Each vertical step scans the row in both
+directions, and only cells that lead somewhere new become jump points, so
+open rooms are crossed without pushing every cell onto the heap.
+"""
+
+import heapq
+from typing import List
+
+from solvers.optimal import GridMazeSolver
+
+
+class JumpPointMazeSolver(GridMazeSolver):
+    def search(self, grid, start, end):
+        if start == end:
+            self.report(1, 1)
+            return [start]
+
+        roads = grid.roads
+        width = grid.width
+        end_y, end_x = divmod(end, width)
+
+        def heuristic(node):
+            y, x = divmod(node, width)
+            return abs(y - end_y) + abs(x - end_x)
+
+        def jump_horizontal(node, step):
+            while True:
+                previous = node
+                node += step
+                if not roads[node]:
+                    return -1
+                if node == end:
+                    return node
+                if (roads[node - width] and not roads[previous - width]) or (
+                    roads[node + width] and not roads[previous + width]
+                ):
+                    return node
+
+        def jump_vertical(node, step):
+            while True:
+                node += step
+                if not roads[node]:
+                    return -1
+                if node == end:
+                    return node
+                if jump_horizontal(node, 1) >= 0 or jump_horizontal(node, -1) >= 0:
+                    return node
+
+        def directions(node, parent):
+            """Directions worth jumping in from a node given where it was
+            reached from."""
+            if parent < 0:
+                return (1, -1, width, -width)
+            step = node - parent
+            if -width < step < width:
+                step = 1 if step > 0 else -1
+                forced = tuple(
+                    vertical
+                    for vertical in (width, -width)
+                    if roads[node + vertical] and not roads[node - step + vertical]
+                )
+                return (step,) + forced
+            step = width if step > 0 else -width
+            return (step, 1, -1)
+
+        parents = {start: -1}
+        costs = {start: 0}
+        track_frontier = self.instruments.enabled
+        max_frontier = 1
+        heap = [(heuristic(start), 0, start)]
+        expanded = 0
+        while heap:
+            if track_frontier and len(heap) > max_frontier:
+                max_frontier = len(heap)
+            _, neg_cost, node = heapq.heappop(heap)
+            if node == end:
+                self.report(expanded + 1, max_frontier, expanded)
+                return self.expand_jump_points(parents, end, width)
+            cost = -neg_cost
+            if cost > costs[node]:
+                continue
+            expanded += 1
+            for step in directions(node, parents[node]):
+                if -width < step < width:
+                    jump_point = jump_horizontal(node, step)
+                else:
+                    jump_point = jump_vertical(node, step)
+                if jump_point < 0:
+                    continue
+                new_cost = cost + abs(jump_point - node) // abs(step)
+                if jump_point not in costs or new_cost < costs[jump_point]:
+                    costs[jump_point] = new_cost
+                    parents[jump_point] = node
+                    heapq.heappush(
+                        heap, (new_cost + heuristic(jump_point), -new_cost, jump_point)
+                    )
+        self.report(expanded, max_frontier)
+        return []
+
+    @staticmethod
+    def expand_jump_points(parents, end: int, width: int) -> List[int]:
+        """Fill in the straight runs between consecutive jump points so every
+        step of the path is between adjacent cells."""
+        jump_points = [end]
+        while parents[jump_points[-1]] >= 0:
+            jump_points.append(parents[jump_points[-1]])
+        jump_points.reverse()
+
+        path = [jump_points[0]]
+        for a, b in zip(jump_points[:-1], jump_points[1:]):
+            if -width < b - a < width:
+                step = 1 if b > a else -1
+            else:
+                step = width if b > a else -width
+            path.extend(range(a + step, b + step, step))
+        return path
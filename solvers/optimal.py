@@ -0,0 +1,304 @@
+"""
+Iterative shortest path solvers that run on the maze's flat padded grid.
+"""
+
+import heapq
+from abc import abstractmethod
+from collections import deque
+from typing import List, Optional, Tuple
+
+from maze.basic_maze import MazeView
+from maze.graph import PaddedGrid
+from solvers.base import BaseMazeSolver
+
+
+class GridMazeSolver(BaseMazeSolver):
+    """Base for solvers that search over cell ids of Maze.padded_grid rather
+    than Coords. Subclasses implement search and return the cell ids of the
+    path, or an empty list if the end cannot be reached. Searches count what
+    they do in local variables and report it once to self.instruments."""
+
+    def solve(self):
+        instruments = self.instruments
+        with instruments.phase("setup"):
+            grid = self.original_maze.padded_grid
+            start = grid.index(self.start_coords)
+            end = grid.index(self.end_coords)
+
+        with instruments.phase("search"):
+            indices = self.search(grid, start, end)
+
+        with instruments.phase("reconstruction"):
+            path = grid.to_path(indices)
+        if self.visualize and path:
+            self.plot(MazeView(self.original_maze, path), final=True)
+        return path
+
+    def solve_nearest(self):
+        """Find the nearest pair of starts and ends with one multi-source
+        breadth first search."""
+        if self.is_single_pair:
+            return self.solve()
+
+        instruments = self.instruments
+        with instruments.phase("setup"):
+            grid = self.original_maze.padded_grid
+            sources = [grid.index(x) for x in self.starts]
+            targets = [grid.index(x) for x in self.ends]
+
+        with instruments.phase("search"):
+            parents, found = self.breadth_first(grid, sources, targets)
+
+        with instruments.phase("reconstruction"):
+            path = grid.to_path(self.reconstruct(parents, found[0])) if found else ()
+        if self.visualize and path:
+            self.plot(MazeView(self.original_maze, path), final=True)
+        return path
+
+    def solve_pairs(self):
+        """Search once from each start, or once back from each end if there
+        are fewer ends, and reconstruct the paths to every pair from it."""
+        instruments = self.instruments
+        with instruments.phase("setup"):
+            grid = self.original_maze.padded_grid
+            is_forward = len(self.starts) <= len(self.ends)
+            sources, targets = (self.starts, self.ends) if is_forward else (self.ends, self.starts)
+            target_ids = [grid.index(x) for x in targets]
+
+        paths = {}
+        for source in sources:
+            with instruments.phase("search"):
+                parents, _ = self.breadth_first(
+                    grid, [grid.index(source)], target_ids, find_all=True
+                )
+            with instruments.phase("reconstruction"):
+                for target, target_id in zip(targets, target_ids):
+                    path = ()
+                    if parents[target_id] >= 0:
+                        path = grid.to_path(self.reconstruct(parents, target_id))
+                    if is_forward:
+                        paths[(source, target)] = path
+                    else:
+                        paths[(target, source)] = path[::-1]
+        return paths
+
+    @abstractmethod
+    def search(self, grid: PaddedGrid, start: int, end: int) -> List[int]:
+        raise NotImplementedError("This method must be implemented")
+
+    def breadth_first(
+        self,
+        grid: PaddedGrid,
+        sources: List[int],
+        targets: List[int],
+        find_all: bool = False,
+    ) -> Tuple[List[int], List[int]]:
+        """Breadth first search from every source at once, each is its own
+        parent. Stops at the first target reached, or with find_all once every
+        target is reached. Returns the parents and the targets reached."""
+        roads = grid.roads
+        offsets = grid.offsets
+        parents = [-1] * grid.size
+        for source in sources:
+            parents[source] = source
+
+        track_frontier = self.instruments.enabled
+        remaining = set(targets)
+        found = []
+        queue = deque(dict.fromkeys(sources))
+        max_frontier = len(queue)
+        expanded = 0
+        while queue and remaining:
+            if track_frontier and len(queue) > max_frontier:
+                max_frontier = len(queue)
+            node = queue.popleft()
+            expanded += 1
+            if node in remaining:
+                remaining.discard(node)
+                found.append(node)
+                if not find_all:
+                    break
+            for offset in offsets:
+                neighbour = node + offset
+                if roads[neighbour] and parents[neighbour] < 0:
+                    parents[neighbour] = node
+                    queue.append(neighbour)
+        self.report(expanded, max_frontier, expanded - (bool(found) and not find_all))
+        return parents, found
+
+    def report(
+        self, nodes_expanded: int, max_frontier: int, neighbour_lookups: Optional[int] = None
+    ):
+        """Record the search counters. neighbour_lookups is the number of
+        nodes whose neighbours were scanned, every node expanded by default,
+        but not the end when the search stops on reaching it."""
+        if neighbour_lookups is None:
+            neighbour_lookups = nodes_expanded
+        instruments = self.instruments
+        instruments.count("nodes_expanded", nodes_expanded)
+        instruments.count("neighbour_lookups", neighbour_lookups)
+        instruments.record_max("max_frontier", max_frontier)
+
+    @staticmethod
+    def reconstruct(parents: List[int], end: int) -> List[int]:
+        """Walk the parents back from end, the start is its own parent."""
+        path = [end]
+        node = end
+        while parents[node] != node:
+            node = parents[node]
+            path.append(node)
+        path.reverse()
+        return path
+
+
+class BreadthFirstMazeSolver(GridMazeSolver):
+    def search(self, grid, start, end):
+        roads = grid.roads
+        offsets = grid.offsets
+        parents = [-1] * grid.size
+        parents[start] = start
+
+        track_frontier = self.instruments.enabled
+        max_frontier = 1
+        queue = deque((start,))
+        expanded = 0
+        while queue:
+            if track_frontier and len(queue) > max_frontier:
+                max_frontier = len(queue)
+            node = queue.popleft()
+            expanded += 1
+            if node == end:
+                self.report(expanded, max_frontier, expanded - 1)
+                return self.reconstruct(parents, end)
+            for offset in offsets:
+                neighbour = node + offset
+                if roads[neighbour] and parents[neighbour] < 0:
+                    parents[neighbour] = node
+                    queue.append(neighbour)
+        self.report(expanded, max_frontier)
+        return []
+
+
+class AStarMazeSolver(GridMazeSolver):
+    """A* with a Manhattan distance heuristic. Ties on f are broken towards
+    the larger g, which follows corridors instead of widening the search."""
+
+    def search(self, grid, start, end):
+        roads = grid.roads
+        offsets = grid.offsets
+        width = grid.width
+        end_y, end_x = divmod(end, width)
+
+        def heuristic(node):
+            y, x = divmod(node, width)
+            return abs(y - end_y) + abs(x - end_x)
+
+        parents = [-1] * grid.size
+        costs = [-1] * grid.size
+        parents[start] = start
+        costs[start] = 0
+
+        track_frontier = self.instruments.enabled
+        max_frontier = 1
+        heap = [(heuristic(start), 0, start)]
+        expanded = 0
+        while heap:
+            if track_frontier and len(heap) > max_frontier:
+                max_frontier = len(heap)
+            _, neg_cost, node = heapq.heappop(heap)
+            if node == end:
+                self.report(expanded + 1, max_frontier, expanded)
+                return self.reconstruct(parents, end)
+            cost = -neg_cost
+            if cost > costs[node]:
+                # Stale entry, a shorter route to this node was found later
+                continue
+            expanded += 1
+            new_cost = cost + 1
+            for offset in offsets:
+                neighbour = node + offset
+                if roads[neighbour] and (costs[neighbour] < 0 or new_cost < costs[neighbour]):
+                    costs[neighbour] = new_cost
+                    parents[neighbour] = node
+                    heapq.heappush(
+                        heap, (new_cost + heuristic(neighbour), -new_cost, neighbour)
+                    )
+        self.report(expanded, max_frontier)
+        return []
+
+
+class BidirectionalMazeSolver(GridMazeSolver):
+    """Breadth first search from both ends, always expanding a whole layer of
+    the smaller frontier. The best meeting point found in a layer gives the
+    shortest path."""
+
+    def search(self, grid, start, end):
+        if start == end:
+            self.report(1, 1)
+            return [start]
+
+        roads = grid.roads
+        offsets = grid.offsets
+        forward_parents = [-1] * grid.size
+        backward_parents = [-1] * grid.size
+        forward_costs = [-1] * grid.size
+        backward_costs = [-1] * grid.size
+        forward_parents[start] = start
+        backward_parents[end] = end
+        forward_costs[start] = 0
+        backward_costs[end] = 0
+
+        forward = [start]
+        backward = [end]
+        expanded = 0
+        max_frontier = 1
+        while forward and backward:
+            is_forward = len(forward) <= len(backward)
+            if is_forward:
+                frontier, parents, costs, other_costs = (
+                    forward, forward_parents, forward_costs, backward_costs
+                )
+            else:
+                frontier, parents, costs, other_costs = (
+                    backward, backward_parents, backward_costs, forward_costs
+                )
+
+            best_cost = None
+            meeting = None
+            next_frontier = []
+            expanded += len(frontier)
+            max_frontier = max(max_frontier, len(frontier))
+            for node in frontier:
+                new_cost = costs[node] + 1
+                for offset in offsets:
+                    neighbour = node + offset
+                    if not roads[neighbour]:
+                        continue
+                    if other_costs[neighbour] >= 0:
+                        total = costs[node] + 1 + other_costs[neighbour]
+                        if best_cost is None or total < best_cost:
+                            best_cost = total
+                            meeting = (node, neighbour)
+                    if costs[neighbour] < 0:
+                        costs[neighbour] = new_cost
+                        parents[neighbour] = node
+                        next_frontier.append(neighbour)
+
+            if meeting is not None:
+                self.report(expanded, max_frontier)
+                node, neighbour = meeting
+                if is_forward:
+                    head = self.reconstruct(forward_parents, node)
+                    tail = self.reconstruct(backward_parents, neighbour)
+                else:
+                    head = self.reconstruct(forward_parents, neighbour)
+                    tail = self.reconstruct(backward_parents, node)
+                tail.reverse()
+                return head + tail
+
+            if is_forward:
+                forward = next_frontier
+            else:
+                backward = next_frontier
+        self.report(expanded, max_frontier)
+        return []
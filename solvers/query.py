@@ -0,0 +1,128 @@
+"""
+Answer many path queries against the same maze by caching a breadth first
+distance field per end coords.
+"""
+
+from array import array
+from collections import OrderedDict, deque
+from typing import Optional, Tuple
+
+from maze.basic_maze import Maze
+from maze.cells import Coords
+from maze.graph import PaddedGrid
+from solvers.base import BaseMazeSolver
+
+
+class DistanceField:
+    """Distances to, and next steps towards, a single target cell for every
+    cell of a padded grid that can reach it. Cells that cannot reach the
+    target have a distance of -1."""
+
+    __slots__ = ["grid", "target", "distances", "next_steps"]
+
+    def __init__(self, grid: PaddedGrid, target: int):
+        self.grid = grid
+        self.target = target
+
+        roads = grid.roads
+        offsets = grid.offsets
+        distances = [-1] * grid.size
+        next_steps = [-1] * grid.size
+        distances[target] = 0
+        next_steps[target] = target
+
+        queue = deque((target,))
+        while queue:
+            node = queue.popleft()
+            distance = distances[node] + 1
+            for offset in offsets:
+                neighbour = node + offset
+                if roads[neighbour] and distances[neighbour] < 0:
+                    distances[neighbour] = distance
+                    next_steps[neighbour] = node
+                    queue.append(neighbour)
+
+        self.distances = array("i", distances)
+        self.next_steps = array("i", next_steps)
+
+    def distance(self, start: int) -> int:
+        return self.distances[start]
+
+    def path(self, start: int) -> Tuple[Coords]:
+        """Shortest path from start to the target, empty if unreachable."""
+        if self.distances[start] < 0:
+            return ()
+        next_steps = self.next_steps
+        indices = [start]
+        node = start
+        while node != self.target:
+            node = next_steps[node]
+            indices.append(node)
+        return self.grid.to_path(indices)
+
+
+class PathQueryEngine:
+    """Shortest path queries against a maze, reusing distance fields.
+
+    A distance field is built for each end coords on its first query and kept
+    in an LRU cache keyed by the maze's content hash, so later queries to the
+    same end cost only the length of the path. Changing the maze changes its
+    hash, so stale fields are never used.
+    """
+
+    def __init__(self, maze: Maze, max_fields: int = 16):
+        self.maze = maze
+        self.max_fields = max_fields
+        self._fields = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def distance_field(self, end: Coords) -> DistanceField:
+        grid = self.maze.padded_grid
+        key = (self.maze.content_hash, grid.index(end))
+
+        field = self._fields.get(key)
+        if field is not None:
+            self.hits += 1
+            self._fields.move_to_end(key)
+            return field
+
+        self.misses += 1
+        field = DistanceField(grid, key[1])
+        self._fields[key] = field
+        while len(self._fields) > self.max_fields:
+            self._fields.popitem(last=False)
+        return field
+
+    def path(self, start: Coords, end: Coords) -> Tuple[Coords]:
+        """Shortest path from start to end, empty if there is none."""
+        if not (self.maze.is_valid_road(start) and self.maze.is_valid_road(end)):
+            return ()
+        field = self.distance_field(end)
+        return field.path(field.grid.index(start))
+
+    def distance(self, start: Coords, end: Coords) -> Optional[int]:
+        """Number of moves from start to end, None if there is no path."""
+        if not (self.maze.is_valid_road(start) and self.maze.is_valid_road(end)):
+            return None
+        field = self.distance_field(end)
+        distance = field.distance(field.grid.index(start))
+        return distance if distance >= 0 else None
+
+    def clear(self):
+        self._fields.clear()
+
+    def __len__(self):
+        return len(self._fields)
+
+
+class DistanceFieldMazeSolver(BaseMazeSolver):
+    """Solver backed by a PathQueryEngine, repeated solves of the same maze
+    only reconstruct the path from the cached distance field."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.engine = PathQueryEngine(self.original_maze)
+
+    def solve(self):
+        return self.engine.path(self.start_coords, self.end_coords)
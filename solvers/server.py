@@ -0,0 +1,334 @@
+"""
+Long-lived asyncio server answering path queries on mazes kept in memory.
+
+Clients connect over TCP on localhost, or a unix socket, and send one JSON
+object per line:
+    {"id": 1, "maze": "maze_a", "start": [0, 0], "end": [9, 9]}
+and get one JSON object per line back, in the order the answers are ready:
+    {"id": 1, "path": [[0, 0], ...], "length": 19, "latency": 0.0012}
+or {"id": 1, "error": "..."}. {"op": "stats"} returns the latency and batch
+size histograms, {"op": "mazes"} the maze ids.
+
+Requests for the same maze and end that arrive within batch_window seconds
+of each other are answered by one search back from the end to every start,
+breadth first or Dijkstra on weighted mazes, run in a process pool whose
+workers keep their own copy of each maze.
+
+Run from the repository root:
+    python -m solvers.server mazes.xlsx --port 8765
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from maze.basic_maze import Maze
+from maze.cells import Coords
+from solvers.optimal import BreadthFirstMazeSolver
+from solvers.weighted import DijkstraMazeSolver
+from solvers.workers import MazeSource, init_worker, worker_maze
+
+
+class LatencyHistogram:
+    """Counts of values in buckets that double in size from min_value, with
+    the total, count and maximum. Percentiles are the upper bound of the
+    bucket they fall in."""
+
+    def __init__(self, min_value: float = 1e-4, num_buckets: int = 24):
+        self.min_value = min_value
+        self.counts = [0] * num_buckets
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def bucket_bound(self, i: int) -> float:
+        return self.min_value * 2**i
+
+    def record(self, value: float):
+        if value <= self.min_value:
+            i = 0
+        else:
+            i = min(math.ceil(math.log2(value / self.min_value)), len(self.counts) - 1)
+        self.counts[i] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.bucket_bound(i), self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return dict(
+            count=self.count,
+            mean=self.total / self.count if self.count else None,
+            max=self.max,
+            p50=self.percentile(50),
+            p90=self.percentile(90),
+            p99=self.percentile(99),
+            buckets={f"{self.bucket_bound(i):.6g}": x for i, x in enumerate(self.counts) if x},
+        )
+
+
+def parse_coords(value, num_rows: int, num_cols: int, name: str = "Coords") -> Tuple[int, int]:
+    """The (x, y) of a query's [x, y], raising RuntimeError unless it is two
+    ints inside a maze of num_rows by num_cols."""
+    is_pair = isinstance(value, (list, tuple)) and len(value) == 2
+    if not is_pair or not all(isinstance(x, int) and not isinstance(x, bool) for x in value):
+        raise RuntimeError(f"{name} must be two ints [x, y], not {value!r}")
+    x, y = value
+    if not (0 <= x < num_cols and 0 <= y < num_rows):
+        raise RuntimeError(f"{name} {[x, y]} is outside the {num_cols}x{num_rows} maze")
+    return x, y
+
+
+def solve_batch(
+    maze_id: str, end: Tuple[int, int], starts: Sequence[Tuple[int, int]]
+) -> List[Union[List[Tuple[int, int]], str]]:
+    """Worker body, the path from each start to end as (x, y) pairs, [] if
+    there is none, or an error message for that start. An error for one
+    start never fails the others."""
+    maze = worker_maze(maze_id)
+    try:
+        end_coords = Coords(*parse_coords(end, maze.num_rows, maze.num_cols, "End"))
+        if not maze.is_valid_road(end_coords):
+            raise RuntimeError(f"End {list(end)} is not a road")
+    except Exception as e:
+        return [str(e)] * len(starts)
+
+    results: List[Union[Coords, str]] = []
+    for start in starts:
+        try:
+            coords = Coords(*parse_coords(start, maze.num_rows, maze.num_cols, "Start"))
+            if not maze.is_valid_road(coords):
+                raise RuntimeError(f"Start {list(start)} is not a road")
+            results.append(coords)
+        except Exception as e:
+            results.append(str(e))
+
+    valid = list(dict.fromkeys(x for x in results if isinstance(x, Coords)))
+    # Both solve_pairs search once back from the single end to every start
+    solver_class = DijkstraMazeSolver if maze.is_weighted else BreadthFirstMazeSolver
+    paths = {}
+    try:
+        if valid:
+            solver = solver_class(maze, starts=valid, ends=(end_coords,))
+            paths = {start: path for (start, _), path in solver.solve_pairs().items()}
+    except Exception:
+        # Fall back to one search per start, so the error stays with its start
+        for start in valid:
+            try:
+                paths[start] = solver_class(maze, start, end_coords).solve()
+            except Exception as e:
+                paths[start] = f"{type(e).__name__}: {e}"
+
+    for i, result in enumerate(results):
+        if isinstance(result, Coords):
+            path = paths[result]
+            results[i] = path if isinstance(path, str) else [(c.x, c.y) for c in path]
+    return results
+
+
+def maze_shape(maze_id: str) -> Tuple[int, int]:
+    """Worker body, the (num_rows, num_cols) of the maze, which the worker
+    then keeps for its batches."""
+    maze = worker_maze(maze_id)
+    return maze.num_rows, maze.num_cols
+
+
+class SolveServer:
+    """Batches path queries by maze and end and solves them in a process pool.
+
+    mazes maps a maze id to a MazeSource, which each worker loads itself, or
+    a loaded Maze, which is sent to each worker once.
+    """
+
+    def __init__(
+        self,
+        mazes: Dict[str, Union[MazeSource, Maze]],
+        max_workers: Optional[int] = None,
+        batch_window: float = 0.002,
+    ):
+        self.mazes = mazes
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.batch_window = batch_window
+        self.latency = LatencyHistogram()
+        self.batch_sizes = LatencyHistogram(min_value=1, num_buckets=16)
+        self._executor = None
+        self._server = None
+        # Maze id to a future of its (num_rows, num_cols), for checking
+        # queries before they are batched
+        self._shapes: Dict[str, asyncio.Future] = {}
+        # (maze id, end) to the starts and futures waiting for the next batch
+        self._pending: Dict[Tuple[str, Tuple[int, int]], List[tuple]] = {}
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765, socket_path: Optional[str] = None):
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers, initializer=init_worker, initargs=(self.mazes,)
+        )
+        if socket_path:
+            self._server = await asyncio.start_unix_server(self.handle_client, path=socket_path)
+        else:
+            self._server = await asyncio.start_server(self.handle_client, host, port)
+        return self._server
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def solve(self, maze_id: str, start: Tuple[int, int], end: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Queue a query for the next batch of its maze and end and wait for
+        its path."""
+        num_rows, num_cols = await self.maze_shape(maze_id)
+        start = parse_coords(start, num_rows, num_cols, "Start")
+        end = parse_coords(end, num_rows, num_cols, "End")
+        key = (maze_id, end)
+        future = asyncio.get_running_loop().create_future()
+        waiting = self._pending.get(key)
+        if waiting is None:
+            waiting = self._pending[key] = []
+            asyncio.get_running_loop().call_later(self.batch_window, self._run_batch, key)
+        waiting.append((start, future))
+
+        result = await future
+        if isinstance(result, str):
+            raise RuntimeError(result)
+        return result
+
+    async def maze_shape(self, maze_id: str) -> Tuple[int, int]:
+        """(num_rows, num_cols) of the maze. A MazeSource is loaded once, by
+        a worker, so the event loop keeps answering other queries."""
+        shape = self._shapes.get(maze_id)
+        if shape is None:
+            if maze_id not in self.mazes:
+                raise RuntimeError(f"Unknown maze {maze_id}")
+            source = self.mazes[maze_id]
+            loop = asyncio.get_running_loop()
+            if isinstance(source, Maze):
+                shape = loop.create_future()
+                shape.set_result((source.num_rows, source.num_cols))
+            else:
+                shape = loop.run_in_executor(self._executor, maze_shape, maze_id)
+            self._shapes[maze_id] = shape
+        return await shape
+
+    def _run_batch(self, key):
+        waiting = self._pending.pop(key)
+        self.batch_sizes.record(len(waiting))
+        maze_id, end = key
+        starts = [start for start, _ in waiting]
+        batch = asyncio.get_running_loop().run_in_executor(
+            self._executor, solve_batch, maze_id, end, starts
+        )
+
+        def finish(batch):
+            error = batch.exception()
+            results = [str(error)] * len(waiting) if error else batch.result()
+            for (_, future), result in zip(waiting, results):
+                if not future.done():
+                    future.set_result(result)
+
+        batch.add_done_callback(finish)
+
+    def stats(self) -> dict:
+        return dict(latency=self.latency.to_dict(), batch_sizes=self.batch_sizes.to_dict())
+
+    async def handle_request(self, request: dict) -> dict:
+        response = {"id": request.get("id")}
+        op = request.get("op", "solve")
+        if op == "stats":
+            response.update(self.stats())
+        elif op == "mazes":
+            response["mazes"] = list(self.mazes)
+        elif op == "solve":
+            start_time = time.perf_counter()
+            path = await self.solve(request["maze"], request["start"], request["end"])
+            response["path"] = path
+            response["length"] = len(path)
+            response["latency"] = time.perf_counter() - start_time
+            self.latency.record(response["latency"])
+        else:
+            raise RuntimeError(f"Unknown op {op}")
+        return response
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Answer each line as soon as it is solved, so one slow query does
+        not hold up the rest of the connection."""
+        lock = asyncio.Lock()
+
+        async def answer(line: bytes):
+            request = {}
+            try:
+                request = json.loads(line)
+                response = await self.handle_request(request)
+            except Exception as e:
+                response = {"id": request.get("id"), "error": f"{type(e).__name__}: {e}"}
+            async with lock:
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    task = asyncio.ensure_future(answer(line))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("file_path", help="Workbook whose sheets are served, by sheet name")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", help="Serve on this unix socket instead of TCP")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--batch-window", type=float, default=0.002)
+    args = parser.parse_args()
+
+    # Loads through the binary cache, so every worker can load its mazes fast
+    sheet_names = Maze.load_all_from_excel(args.file_path)
+    mazes = {name: MazeSource(args.file_path, name) for name in sheet_names}
+    server = SolveServer(mazes, args.workers, args.batch_window)
+
+    async def serve():
+        await server.start(args.host, args.port, args.socket)
+        print(f"Serving {len(mazes)} mazes on {args.socket or f'{args.host}:{args.port}'}")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
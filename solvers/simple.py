@@ -1,20 +1,40 @@
-import copy
 import random
 import math
-from typing import Tuple
+from typing import Optional, Tuple
 from collections import OrderedDict
 
+from maze.basic_maze import MazeView
 from maze.cells import Coords, Moves
 
 from solvers.base import BaseMazeSolver
 
 
 class SimpleMazeSolver(BaseMazeSolver):
+    # Counted by snake_path_recursive and reported once per solve
+    _expanded = _lookups = _max_depth = 0
+    # While visualizing, the search on the pruned maze is drawn on this view
+    # of the original maze
+    _plot_view = None
+
     def solve(self):
-        path, found = self.snake_path_recursive(path=(self.start_coords,))
-        final_path = copy.deepcopy(self.original_maze)
-        final_path.apply_path(path)
-        final_path.plot()
+        # Fail fast rather than exploring the whole region around the start,
+        # and never walk into dead ends, which cannot hold the end
+        with self.instruments.phase("setup"):
+            if not self.is_solvable():
+                return ()
+            maze_view = MazeView(self.pruned_maze())
+            if self.visualize:
+                self._plot_view = MazeView(self.original_maze)
+
+        with self.instruments.phase("search"):
+            self._expanded = self._lookups = self._max_depth = 0
+            path, found = self.snake_path_recursive(
+                path=(self.start_coords,), maze_view=maze_view
+            )
+            self.report_steps(self._expanded, self._lookups, self._max_depth)
+            self._plot_view = None
+        if self.visualize:
+            self.plot(MazeView(self.original_maze, path), final=True)
         return path if found else ()
 
     # Option 1: Simply prioritizes the down, right path
@@ -93,36 +113,50 @@ class SimpleMazeSolver(BaseMazeSolver):
                 return ["U", "L"]
 
     def snake_path_recursive(
-            self, path: Tuple[Coords], found: bool = False
+            self,
+            path: Tuple[Coords],
+            found: bool = False,
+            maze_view: Optional[MazeView] = None,
     ) -> Tuple[Tuple[Coords], bool]:
 
         if found:
             return path, found
 
-        pre_maze = copy.deepcopy(self.original_maze)
-        pre_maze.apply_path(path[:-1])
+        if maze_view is None:
+            maze_view = MazeView(self.original_maze, path[:-1])
 
-        if pre_maze.is_valid_road(path[-1]):
+        if maze_view.is_valid_road(path[-1]):
 
-            post_maze = copy.deepcopy(pre_maze)
-            post_maze.apply_path((path[-1],))
-            if self.visualize:
-                post_maze.plot()
+            maze_view.push(path[-1])
+            plot_view = self._plot_view
+            if plot_view is not None:
+                plot_view.push(path[-1])
+                self.plot(plot_view)
+            self._expanded += 1
+            if len(path) > self._max_depth:
+                self._max_depth = len(path)
 
             if path[-1] == self.end_coords:
                 return path, True
             else:
-                all_new_coords = list(post_maze.adjacent_roads(path[-1]))
+                all_new_coords = list(maze_view.adjacent_roads(path[-1]))
+                self._lookups += 1
                 if len(all_new_coords) > 1:
                     all_new_coords = self.roads_priority(path, all_new_coords)
 
                 # random.shuffle(all_new_coords)
                 for new_coords in all_new_coords:
                     new_path = path + (new_coords,)
-                    new_path, new_found = self.snake_path_recursive(path=new_path)  # type: ignore
+                    new_path, new_found = self.snake_path_recursive(
+                        path=new_path, maze_view=maze_view
+                    )  # type: ignore
                     if new_found:
                         return new_path, new_found
 
+            maze_view.pop()
+            if plot_view is not None:
+                plot_view.pop()
+
         return path, False
 
     @staticmethod
@@ -131,44 +165,78 @@ class SimpleMazeSolver(BaseMazeSolver):
 
 
 class PseudoDirectionalMazeSolver(BaseMazeSolver):
+    # Counted by snake_path_recursive and reported once per solve
+    _expanded = _lookups = _max_depth = 0
+    # While visualizing, the search on the pruned maze is drawn on this view
+    # of the original maze
+    _plot_view = None
+
     def solve(self):
-        path, found = self.snake_path_recursive(path=(self.start_coords,))
-        final_path = copy.deepcopy(self.original_maze)
-        final_path.apply_path(path)
-        final_path.plot()
+        # Fail fast rather than exploring the whole region around the start,
+        # and never walk into dead ends, which cannot hold the end
+        with self.instruments.phase("setup"):
+            if not self.is_solvable():
+                return ()
+            maze_view = MazeView(self.pruned_maze())
+            if self.visualize:
+                self._plot_view = MazeView(self.original_maze)
+
+        with self.instruments.phase("search"):
+            self._expanded = self._lookups = self._max_depth = 0
+            path, found = self.snake_path_recursive(
+                path=(self.start_coords,), maze_view=maze_view
+            )
+            self.report_steps(self._expanded, self._lookups, self._max_depth)
+            self._plot_view = None
+        if self.visualize:
+            self.plot(MazeView(self.original_maze, path), final=True)
         return path if found else ()
 
     def snake_path_recursive(
-            self, path: Tuple[Coords], found: bool = False
+            self,
+            path: Tuple[Coords],
+            found: bool = False,
+            maze_view: Optional[MazeView] = None,
     ) -> Tuple[Tuple[Coords], bool]:
 
         if found:
             return path, found
 
-        pre_maze = copy.deepcopy(self.original_maze)
-        pre_maze.apply_path(path[:-1])
+        if maze_view is None:
+            maze_view = MazeView(self.original_maze, path[:-1])
 
-        if pre_maze.is_valid_road(path[-1]):
+        if maze_view.is_valid_road(path[-1]):
 
-            post_maze = copy.deepcopy(pre_maze)
-            post_maze.apply_path((path[-1],))
-            if self.visualize:
-                post_maze.plot()
+            maze_view.push(path[-1])
+            plot_view = self._plot_view
+            if plot_view is not None:
+                plot_view.push(path[-1])
+                self.plot(plot_view)
+            self._expanded += 1
+            if len(path) > self._max_depth:
+                self._max_depth = len(path)
 
             if path[-1] == self.end_coords:
                 return path, True
             else:
-                all_new_coords = list(post_maze.adjacent_roads(path[-1]))
+                all_new_coords = list(maze_view.adjacent_roads(path[-1]))
+                self._lookups += 1
                 coords_and_distance = [
                     (c, self.distance(self.end_coords, c)) for c in all_new_coords
                 ]
                 coords_and_distance = sorted(coords_and_distance, key=lambda x: x[1])
                 for new_coords, _ in coords_and_distance:
                     new_path = path + (new_coords,)
-                    new_path, new_found = self.snake_path_recursive(path=new_path)  # type: ignore
+                    new_path, new_found = self.snake_path_recursive(
+                        path=new_path, maze_view=maze_view
+                    )  # type: ignore
                     if new_found:
                         return new_path, new_found
 
+            maze_view.pop()
+            if plot_view is not None:
+                plot_view.pop()
+
         return path, False
 
     @staticmethod
@@ -0,0 +1,62 @@
+"""
+Breadth first search run a whole layer at a time with NumPy.
+"""
+
+import numpy as np
+
+from solvers.optimal import GridMazeSolver
+
+
+class WavefrontMazeSolver(GridMazeSolver):
+    """Breadth first search without a per cell Python loop.
+
+    The frontier is an array of the cell ids at the current distance from
+    the start. Each layer adds every offset to the whole frontier at once,
+    keeps the roads not yet visited and records their distance. Once the end
+    is reached the path is found by stepping from the end to a neighbour one
+    closer to the start until the start is reached.
+
+    Each layer is a few NumPy calls over the frontier rather than the whole
+    grid, so wide open mazes with large frontiers gain the most.
+    """
+
+    def search(self, grid, start, end):
+        unvisited = np.frombuffer(grid.roads, dtype=np.uint8).astype(bool)
+        offsets = np.array(grid.offsets, dtype=np.int64)
+        distances = np.full(grid.size, -1, dtype=np.int32)
+        distances[start] = 0
+        unvisited[start] = False
+
+        frontier = np.array([start], dtype=np.int64)
+        distance = 0
+        expanded = 0
+        max_frontier = 1
+        while frontier.size and distances[end] < 0:
+            expanded += frontier.size
+            max_frontier = max(max_frontier, frontier.size)
+            distance += 1
+            neighbours = (frontier[:, None] + offsets).ravel()
+            frontier = np.unique(neighbours[unvisited[neighbours]])
+            unvisited[frontier] = False
+            distances[frontier] = distance
+        self.report(expanded, max_frontier)
+
+        if distances[end] < 0:
+            return []
+        return self.descend(distances, grid.offsets, end)
+
+    @staticmethod
+    def descend(distances: np.ndarray, offsets, end: int):
+        """Follow the distances down from end to the start, at distance 0."""
+        path = [end]
+        node = end
+        distance = distances[end]
+        while distance > 0:
+            distance -= 1
+            for offset in offsets:
+                if distances[node + offset] == distance:
+                    node += offset
+                    break
+            path.append(node)
+        path.reverse()
+        return path
@@ -0,0 +1,174 @@
+"""
+Cheapest path solvers for mazes with cell costs, see Maze.set_costs.
+"""
+
+import heapq
+import math
+from typing import List
+
+from maze.graph import PaddedGrid
+from solvers.base import BaseMazeSolver
+from solvers.optimal import GridMazeSolver
+
+
+class WeightedAStarMazeSolver(GridMazeSolver):
+    """A* over the cost of the cells entered, with the Manhattan distance times
+    the cheapest road cost, times weight, as the heuristic. With weight 1 the
+    path is the cheapest, larger weights expand fewer cells for paths that
+    cost at most weight times as much.
+
+    Costs are small integers, so the open set is a bucket queue: the cells
+    of each priority share a list, and a heap holds only the distinct
+    priorities in use, usually a few dozen, instead of every open cell.
+    """
+
+    def __init__(self, *args, weight: float = 1.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.weight = weight
+
+    # The breadth first searches of GridMazeSolver ignore costs
+    solve_nearest = BaseMazeSolver.solve_nearest
+    solve_pairs = BaseMazeSolver.solve_pairs
+
+    def search(self, grid, start, end):
+        roads = grid.roads
+        offsets = grid.offsets
+        costs = self.original_maze.padded_costs
+        width = grid.width
+        end_y, end_x = divmod(end, width)
+        scale = self.weight * self.original_maze.min_road_cost()
+
+        distances = [math.inf] * grid.size
+        parents = [-1] * grid.size
+        closed = bytearray(grid.size)
+        distances[start] = 0
+        parents[start] = start
+
+        start_y, start_x = divmod(start, width)
+        first_priority = int(scale * (abs(start_x - end_x) + abs(start_y - end_y)))
+        buckets = {first_priority: [start]}
+        priorities = [first_priority]
+        track_frontier = self.instruments.enabled
+        frontier = max_frontier = 1
+        expanded = 0
+        while priorities:
+            if track_frontier and frontier > max_frontier:
+                max_frontier = frontier
+            priority = priorities[0]
+            bucket = buckets[priority]
+            node = bucket.pop()
+            frontier -= 1
+            if not bucket:
+                heapq.heappop(priorities)
+                del buckets[priority]
+            if closed[node]:
+                continue
+            closed[node] = 1
+            expanded += 1
+            if node == end:
+                self.report(expanded, max_frontier, expanded - 1)
+                return self.reconstruct(parents, end)
+
+            distance = distances[node]
+            for offset in offsets:
+                neighbour = node + offset
+                if roads[neighbour] and not closed[neighbour]:
+                    new_distance = distance + (1 if costs is None else costs[neighbour])
+                    if new_distance < distances[neighbour]:
+                        distances[neighbour] = new_distance
+                        parents[neighbour] = node
+                        if scale:
+                            y, x = divmod(neighbour, width)
+                            new_priority = new_distance + int(
+                                scale * (abs(x - end_x) + abs(y - end_y))
+                            )
+                        else:
+                            new_priority = new_distance
+                        bucket = buckets.get(new_priority)
+                        if bucket is None:
+                            buckets[new_priority] = [neighbour]
+                            heapq.heappush(priorities, new_priority)
+                        else:
+                            bucket.append(neighbour)
+                        frontier += 1
+        self.report(expanded, max_frontier)
+        return []
+
+
+class DijkstraMazeSolver(WeightedAStarMazeSolver):
+    """Cheapest path by Dijkstra's algorithm, A* without a heuristic."""
+
+    def __init__(self, *args, **kwargs):
+        kwargs["weight"] = 0
+        super().__init__(*args, **kwargs)
+
+    def solve_pairs(self):
+        """Search once from each start, or once back from each end if there
+        are fewer ends, like GridMazeSolver.solve_pairs."""
+        instruments = self.instruments
+        with instruments.phase("setup"):
+            grid = self.original_maze.padded_grid
+            is_forward = len(self.starts) <= len(self.ends)
+            sources, targets = (self.starts, self.ends) if is_forward else (self.ends, self.starts)
+            target_ids = [grid.index(x) for x in targets]
+
+        paths = {}
+        for source in sources:
+            with instruments.phase("search"):
+                parents = self.cheapest_tree(grid, grid.index(source), target_ids, is_forward)
+            with instruments.phase("reconstruction"):
+                for target, target_id in zip(targets, target_ids):
+                    path = ()
+                    if parents[target_id] >= 0:
+                        path = grid.to_path(self.reconstruct(parents, target_id))
+                    if is_forward:
+                        paths[(source, target)] = path
+                    else:
+                        paths[(target, source)] = path[::-1]
+        return paths
+
+    def cheapest_tree(
+        self, grid: PaddedGrid, source: int, targets: List[int], is_forward: bool = True
+    ) -> List[int]:
+        """Dijkstra from source until every target is reached, returning the
+        parents. Searching back from an end, a step costs the cell it leaves
+        rather than the one it enters, so the reversed paths are the cheapest
+        forward ones."""
+        roads = grid.roads
+        offsets = grid.offsets
+        costs = self.original_maze.padded_costs
+
+        distances = [math.inf] * grid.size
+        parents = [-1] * grid.size
+        closed = bytearray(grid.size)
+        distances[source] = 0
+        parents[source] = source
+
+        remaining = set(targets)
+        heap = [(0, source)]
+        track_frontier = self.instruments.enabled
+        max_frontier = 1
+        expanded = 0
+        while heap and remaining:
+            if track_frontier and len(heap) > max_frontier:
+                max_frontier = len(heap)
+            distance, node = heapq.heappop(heap)
+            if closed[node]:
+                continue
+            closed[node] = 1
+            expanded += 1
+            remaining.discard(node)
+
+            step_cost = 1 if costs is None else costs[node]
+            for offset in offsets:
+                neighbour = node + offset
+                if roads[neighbour] and not closed[neighbour]:
+                    if costs is not None and is_forward:
+                        step_cost = costs[neighbour]
+                    new_distance = distance + step_cost
+                    if new_distance < distances[neighbour]:
+                        distances[neighbour] = new_distance
+                        parents[neighbour] = node
+                        heapq.heappush(heap, (new_distance, neighbour))
+        self.report(expanded, max_frontier)
+        return parents
@@ -0,0 +1,47 @@
+"""
+Mazes kept by the worker processes of a process pool.
+
+Pass init_worker as the pool's initializer with the mazes by name. Each
+worker then loads a maze on the first call to worker_maze for it and keeps
+it for every later task, so large mazes are not sent with every task.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Union
+
+from maze.basic_maze import Maze
+
+
+@dataclass(frozen=True)
+class MazeSource:
+    """Where a worker should load a maze from."""
+
+    file_path: str
+    sheet_name: Optional[str] = None
+
+    def load(self) -> Maze:
+        mazes = Maze.load_all_from_excel(self.file_path)
+        return mazes[self.sheet_name or next(iter(mazes))]
+
+
+# Mazes held by each worker process, loaded on first use
+_WORKER_SOURCES: Dict[str, Union[MazeSource, Maze]] = {}
+_WORKER_MAZES: Dict[str, Maze] = {}
+
+
+def init_worker(sources: Dict[str, Union[MazeSource, Maze]]):
+    """Set the mazes of this process by name, a MazeSource to load each
+    maze from or the loaded Maze."""
+    _WORKER_SOURCES.clear()
+    _WORKER_SOURCES.update(sources)
+    _WORKER_MAZES.clear()
+
+
+def worker_maze(maze_name: str) -> Maze:
+    """The maze of this process with the name, loading it on first use."""
+    maze = _WORKER_MAZES.get(maze_name)
+    if maze is None:
+        source = _WORKER_SOURCES[maze_name]
+        maze = source if isinstance(source, Maze) else source.load()
+        _WORKER_MAZES[maze_name] = maze
+    return maze
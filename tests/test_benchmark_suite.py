@@ -0,0 +1,20 @@
+from solvers.benchmark_suite import BenchmarkSuite, MazeCase
+from solvers.optimal import BreadthFirstMazeSolver
+
+
+def test_random_cases_run_at_each_density():
+    suite = BenchmarkSuite(
+        [BreadthFirstMazeSolver], sizes=(20,), kinds=("perfect", "random"), densities=(0.1, 0.4)
+    )
+    names = [case.name for case in suite.cases]
+    assert names == [
+        "perfect_20x20_seed1",
+        "random_density0.1_20x20_seed1",
+        "random_density0.4_20x20_seed1",
+    ]
+
+
+def test_density_changes_the_maze():
+    sparse = MazeCase("random", 50, density=0.1).build().cell_array.road_mask
+    dense = MazeCase("random", 50, density=0.4).build().cell_array.road_mask
+    assert sparse.mean() > dense.mean() + 0.2
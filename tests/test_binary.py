@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from maze.basic_maze import Maze
+from maze.cells import CellValues, Coords
+from maze.generators import random_obstacles
+
+
+@pytest.mark.parametrize("packed", [False, True])
+@pytest.mark.parametrize("mmap", [False, True])
+@pytest.mark.parametrize("shape", [(1, 1), (7, 9), (16, 8), (33, 50)])
+def test_round_trip(tmp_path, shape, packed, mmap):
+    maze = random_obstacles(*shape, density=0.3, seed=1)
+    file_path = str(tmp_path / "maze.maze")
+    maze.save_binary(file_path, packed=packed)
+
+    loaded = Maze.load_binary(file_path, mmap=mmap)
+    assert (loaded.num_rows, loaded.num_cols) == shape
+    assert np.array_equal(loaded.cell_array.grid, maze.cell_array.grid)
+    assert loaded.content_hash == maze.content_hash
+
+
+def test_packed_files_are_smaller(tmp_path):
+    maze = random_obstacles(64, 64, seed=1)
+    maze.save_binary(str(tmp_path / "plain.maze"))
+    maze.save_binary(str(tmp_path / "packed.maze"), packed=True)
+    plain_size = (tmp_path / "plain.maze").stat().st_size
+    packed_size = (tmp_path / "packed.maze").stat().st_size
+    assert packed_size < plain_size / 4
+
+
+def test_memory_mapped_changes_stay_in_memory(tmp_path):
+    maze = random_obstacles(20, 20, density=0.3, seed=1)
+    file_path = tmp_path / "maze.maze"
+    maze.save_binary(str(file_path))
+    contents = file_path.read_bytes()
+
+    loaded = Maze.load_binary(str(file_path), mmap=True)
+    coords = Coords(5, 5)
+    value = CellValues.BLOCK if loaded.value(coords) == CellValues.ROAD else CellValues.ROAD
+    loaded.set_value(coords, value)
+    assert loaded.value(coords) == value
+    del loaded
+
+    assert file_path.read_bytes() == contents
+    assert Maze.load_binary(str(file_path)).value(coords) == maze.value(coords)
@@ -0,0 +1,23 @@
+import numpy as np
+
+from maze.cells import CellArray, CellValues, Coords, NumpyCellArray
+
+ROWS = [[0, 1, 0], [0, 0, 1]]
+
+
+def test_numpy_cell_array_matches_cell_array():
+    legacy = CellArray.load_from_iterables(ROWS)
+    cells = NumpyCellArray.load_from_iterables(ROWS)
+    assert np.array_equal(cells.grid, legacy.grid)
+    assert cells.value_array == legacy.value_array
+    assert [[x.value for x in row] for row in cells.array] == [
+        [x.value for x in row] for row in legacy.array
+    ]
+
+
+def test_numpy_cell_array_cells_are_a_copy():
+    cells = NumpyCellArray.load_from_iterables(ROWS)
+    cells.array[0][0].value = CellValues.PATH
+    assert cells.get_cell_value(Coords(0, 0)) == CellValues.ROAD
+    cells.set_cell_value(Coords(0, 0), CellValues.PATH)
+    assert cells.array[0][0].value == CellValues.PATH
@@ -0,0 +1,43 @@
+import pytest
+
+from maze.basic_maze import Maze
+from maze.cells import Coords
+from solvers.optimal import BreadthFirstMazeSolver
+
+ROWS = [[0, 0, 0], [1, 1, 0], [0, 0, 0]]
+C = Coords
+
+
+@pytest.fixture
+def solver():
+    return BreadthFirstMazeSolver(Maze(ROWS))
+
+
+def test_solved_path_is_valid(solver):
+    path = solver.solve()
+    assert solver.check_path(path) == (True, None)
+    assert solver.validate_path(path)
+
+
+@pytest.mark.parametrize(
+    "path, first_invalid",
+    [
+        ((), 0),
+        ((C(1, 0), C(2, 0), C(2, 1), C(2, 2)), 0),
+        ((C(0, 0), C(1, 0), C(2, 0), C(2, 2)), 3),
+        ((C(0, 0), C(1, 0), C(2, 1), C(2, 2)), 2),
+        ((C(0, 0), C(0, 1), C(0, 2), C(1, 2), C(2, 2)), 1),
+        ((C(0, 0), C(-1, 0), C(0, 0)), 1),
+        ((C(0, 0), C(1, 0), C(2, 0), C(3, 0)), 3),
+        ((C(0, 0), C(1, 0), C(2, 0), C(2, 1)), 3),
+    ],
+    ids=["empty", "wrong start", "jump", "diagonal", "block", "off grid", "past edge", "short"],
+)
+def test_first_invalid_step(solver, path, first_invalid):
+    assert solver.check_path(path) == (False, first_invalid)
+
+
+def test_other_starts_and_ends(solver):
+    path = (C(2, 2), C(1, 2), C(0, 2))
+    assert not solver.validate_path(path)
+    assert solver.check_path(path, starts=(C(2, 2),), ends=(C(0, 2), C(0, 0))).is_valid
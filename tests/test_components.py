@@ -0,0 +1,79 @@
+from collections import deque
+
+import numpy as np
+import pytest
+
+from maze.basic_maze import Maze
+from maze.cells import CellValues, Coords
+from maze.generators import kruskal, random_obstacles
+from maze.graph import label_components
+from solvers.optimal import BreadthFirstMazeSolver
+
+
+def flood_fill_labels(road_mask):
+    """Label components in the order their first cell is scanned."""
+    labels = np.zeros(road_mask.shape, dtype=np.int64)
+    num_rows, num_cols = road_mask.shape
+    label = 0
+    for y, x in zip(*np.nonzero(road_mask)):
+        if labels[y, x]:
+            continue
+        label += 1
+        labels[y, x] = label
+        queue = deque([(y, x)])
+        while queue:
+            cy, cx = queue.popleft()
+            for ny, nx in ((cy - 1, cx), (cy + 1, cx), (cy, cx - 1), (cy, cx + 1)):
+                in_bounds = 0 <= ny < num_rows and 0 <= nx < num_cols
+                if in_bounds and road_mask[ny, nx] and not labels[ny, nx]:
+                    labels[ny, nx] = label
+                    queue.append((ny, nx))
+    return labels
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("density", [0.3, 0.45, 0.6])
+def test_labels_match_flood_fill(seed, density):
+    road_mask = random_obstacles(23, 37, density=density, seed=seed).cell_array.road_mask
+    labels = label_components(road_mask)
+    expected = flood_fill_labels(road_mask)
+    assert np.array_equal(labels == 0, expected == 0)
+    # Same groups, whatever the numbering, labelled 1 upwards
+    pairs = set(zip(labels[road_mask].tolist(), expected[road_mask].tolist()))
+    assert len(pairs) == expected.max() == len({a for a, _ in pairs})
+    assert set(np.unique(labels[road_mask]).tolist()) == set(range(1, expected.max() + 1))
+
+
+def test_is_reachable():
+    maze = Maze([[0, 1, 0], [0, 1, 0], [0, 0, 1]])
+    assert maze.is_reachable(Coords(0, 0), Coords(1, 2))
+    assert not maze.is_reachable(Coords(0, 0), Coords(2, 0))
+    assert not maze.is_reachable(Coords(0, 0), Coords(1, 0))
+    maze.set_value(Coords(0, 2), CellValues.PATH)
+    assert not maze.is_reachable(Coords(0, 0), Coords(1, 2))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_filling_a_perfect_maze_leaves_only_the_path(seed):
+    maze = kruskal(21, 31, seed=seed)
+    solver = BreadthFirstMazeSolver(maze)
+    path = solver.solve()
+    pruned = solver.pruned_maze()
+    remaining = np.argwhere(pruned.cell_array.road_mask)
+    assert {Coords(int(x), int(y)) for y, x in remaining} == set(path)
+    assert BreadthFirstMazeSolver(pruned).solve() == path
+
+
+def test_dead_end_masks_are_cached_until_changes():
+    maze = kruskal(11, 11, seed=1)
+    keep = (Coords(0, 0), Coords(10, 10))
+    mask = maze.dead_end_mask(keep)
+    assert maze.dead_end_mask(keep[::-1]) is mask
+    assert not mask.flags.writeable
+
+    for x in range(11):
+        maze.dead_end_mask((Coords(x, 0),))
+    assert len(maze._dead_end_masks) <= maze.MAX_DEAD_END_MASKS
+
+    maze.set_value(Coords(0, 0), CellValues.PATH)
+    assert maze.dead_end_mask(keep) is not mask
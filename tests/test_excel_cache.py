@@ -0,0 +1,48 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from maze.basic_maze import Maze
+
+WORKBOOK = os.path.join(os.path.dirname(__file__), "..", "mazes.xlsx")
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    file_path = str(tmp_path / "mazes.xlsx")
+    shutil.copy(WORKBOOK, file_path)
+    return file_path
+
+
+def assert_same_mazes(mazes, expected):
+    assert list(mazes) == list(expected)
+    for name, maze in mazes.items():
+        assert np.array_equal(maze.cell_array.grid, expected[name].cell_array.grid)
+
+
+def test_cached_mazes_match_the_workbook(workbook, tmp_path, monkeypatch):
+    expected = Maze.load_all_from_excel(workbook, use_cache=False)
+    assert_same_mazes(Maze.load_all_from_excel(workbook), expected)
+    cache_dir = tmp_path / ".maze_cache"
+    assert len(os.listdir(cache_dir)) == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError("The workbook should not be parsed again")
+
+    monkeypatch.setattr(Maze, "load_all_from_excel_sheets", fail)
+    assert_same_mazes(Maze.load_all_from_excel(workbook), expected)
+
+
+def test_changed_workbooks_replace_their_entry(workbook, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    Maze.load_all_from_excel(workbook, cache_dir=cache_dir)
+    (first_entry,) = os.listdir(cache_dir)
+
+    stat = os.stat(workbook)
+    os.utime(workbook, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    Maze.load_all_from_excel(workbook, cache_dir=cache_dir)
+    (second_entry,) = os.listdir(cache_dir)
+    assert second_entry != first_entry
+    assert second_entry.split("-")[0] == first_entry.split("-")[0]
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from maze.generators import kruskal, prim, recursive_backtracker
+from solvers.optimal import BreadthFirstMazeSolver
+
+
+@pytest.mark.parametrize("generator", [kruskal, prim, recursive_backtracker])
+@pytest.mark.parametrize("shape", [(1, 1), (1, 9), (9, 1), (21, 31), (40, 25)])
+def test_perfect_mazes_are_spanning_trees(generator, shape):
+    maze = generator(*shape, seed=1)
+    grid = maze.cell_array.grid
+    assert grid.shape == shape
+    # Even sized mazes repeat the last lattice row and column
+    lattice = grid[: shape[0] - 1 + shape[0] % 2, : shape[1] - 1 + shape[1] % 2]
+    num_cells = ((lattice.shape[0] + 1) // 2) * ((lattice.shape[1] + 1) // 2)
+    # Every lattice cell and one wall for each but the first are opened, all
+    # connected, so there is exactly one route between any two cells
+    assert np.count_nonzero(lattice == 0) == 2 * num_cells - 1
+    assert maze.component_labels.max() == 1
+    assert BreadthFirstMazeSolver(maze).solve()
+
+def test_seeded_mazes_repeat():
+    assert np.array_equal(prim(31, 31, seed=5).cell_array.grid, prim(31, 31, seed=5).cell_array.grid)
+    assert not np.array_equal(prim(31, 31, seed=5).cell_array.grid, prim(31, 31, seed=6).cell_array.grid)
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from maze.basic_maze import Maze
+from maze.cells import CellValues, Coords, Moves
+from maze.generators import random_obstacles
+from maze.graph import RoadGraph
+
+
+def brute_force_neighbours(road_mask, coords):
+    num_rows, num_cols = road_mask.shape
+    neighbours = []
+    for move in Moves.ALL:
+        x, y = coords.x + move.x, coords.y + move.y
+        if 0 <= x < num_cols and 0 <= y < num_rows and road_mask[y, x]:
+            neighbours.append(Coords(x, y))
+    return tuple(neighbours)
+
+
+@pytest.mark.parametrize("shape", [(1, 1), (1, 7), (7, 1), (13, 17)])
+def test_neighbours_match_brute_force(shape):
+    maze = random_obstacles(*shape, density=0.4, seed=1)
+    road_mask = maze.cell_array.road_mask
+    graph = RoadGraph.from_road_mask(road_mask)
+    assert len(graph.indptr) == graph.num_cells + 1
+    for y in range(shape[0]):
+        for x in range(shape[1]):
+            coords = Coords(x, y)
+            expected = brute_force_neighbours(road_mask, coords)
+            # Every cell has an entry, blocks included
+            assert graph.neighbours(coords) == expected
+            assert maze.adjacent_roads(coords) == expected
+            assert graph.neighbour_ids(graph.flat_id(coords)).tolist() == [
+                graph.flat_id(c) for c in expected
+            ]
+
+
+def test_neighbours_are_interned():
+    graph = Maze(np.zeros((3, 3), int).tolist()).road_graph
+    assert graph.neighbours(Coords(0, 0))[0] is graph.neighbours(Coords(2, 0))[0]
+
+
+def test_graph_is_rebuilt_after_changes():
+    maze = Maze([[0, 0, 0], [0, 0, 0]])
+    graph = maze.road_graph
+    assert maze.road_graph is graph
+    maze.set_value(Coords(1, 0), CellValues.PATH)
+    assert maze.road_graph is not graph
+    assert Coords(1, 0) not in maze.adjacent_roads(Coords(0, 0))
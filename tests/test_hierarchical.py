@@ -0,0 +1,49 @@
+import gc
+
+import numpy as np
+import pytest
+
+from maze.basic_maze import Maze
+from maze.cells import Coords
+from maze.generators import random_obstacles
+from solvers.benchmark import BenchmarkRunner
+from solvers.hierarchical import HierarchicalMazeSolver
+from solvers.optimal import BreadthFirstMazeSolver
+from solvers.workers import worker_maze
+
+
+@pytest.mark.parametrize("shape", [(22, 4), (40, 5), (4, 22), (33, 1), (1, 33)])
+@pytest.mark.parametrize("cluster_size", [2, 5, 16])
+def test_narrow_and_tall_grids(shape, cluster_size):
+    maze = Maze(np.zeros(shape, int).tolist())
+    path = HierarchicalMazeSolver(maze, cluster_size=cluster_size).solve()
+    solver = BreadthFirstMazeSolver(maze)
+    assert solver.validate_path(path)
+    assert len(path) == len(solver.solve())
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_narrow_grid_with_walls(seed):
+    rng = np.random.default_rng(seed)
+    grid = (rng.random((60, 3)) < 0.2).astype(int)
+    grid[0, 0] = grid[-1, -1] = 0
+    maze = Maze(grid.tolist())
+    reference = BreadthFirstMazeSolver(maze)
+    expected = reference.solve()
+    path = HierarchicalMazeSolver(maze, cluster_size=4).solve()
+    assert bool(path) == bool(expected)
+    if path:
+        assert reference.validate_path(path)
+        assert path[0] == Coords(0, 0) and path[-1] == Coords(2, 59)
+
+
+def test_solvers_are_freed_without_close():
+    maze = random_obstacles(40, 40, seed=1)
+    for _ in range(5):
+        HierarchicalMazeSolver(maze, cluster_size=8).solve()
+    gc.collect()
+    assert len(maze.subscribers) == 0
+
+    runner = BenchmarkRunner({"maze": maze})
+    runner.run_serial([HierarchicalMazeSolver], n=3)
+    assert len(worker_maze("maze").subscribers) == 0
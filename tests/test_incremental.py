@@ -0,0 +1,34 @@
+import gc
+
+from maze.generators import random_obstacles
+from solvers.benchmark import BenchmarkRunner
+from solvers.incremental import DStarLiteMazeSolver
+from solvers.workers import worker_maze
+
+
+def test_freed_solvers_unsubscribe():
+    maze = random_obstacles(30, 30, seed=1)
+    solvers = [DStarLiteMazeSolver(maze) for _ in range(5)]
+    for solver in solvers:
+        solver.solve()
+    assert len(maze.subscribers) == 5
+
+    solvers[0].close()
+    assert len(maze.subscribers) == 4
+    del solvers, solver
+    gc.collect()
+    assert len(maze.subscribers) == 0
+
+
+def test_benchmark_trials_release_their_solvers():
+    runner = BenchmarkRunner({"maze": random_obstacles(30, 30, seed=1)})
+    runner.run_serial([DStarLiteMazeSolver], n=5)
+    assert len(worker_maze("maze").subscribers) == 0
+
+
+def test_plain_functions_stay_subscribed():
+    maze = random_obstacles(10, 10, seed=1)
+    changes = []
+    maze.subscribe(lambda maze, changed: changes.extend(changed))
+    gc.collect()
+    assert len(maze.subscribers) == 1
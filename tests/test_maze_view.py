@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from maze.basic_maze import Maze, MazeView
+from maze.cells import CellValues, Coords
+
+ROWS = [[0, 0, 0], [1, 0, 1], [0, 0, 0]]
+
+
+@pytest.fixture
+def maze():
+    return Maze(ROWS)
+
+
+def test_push_and_pop_leave_the_maze_alone(maze):
+    view = MazeView(maze)
+    view.push(Coords(0, 0))
+    view.push(Coords(1, 0))
+    assert view.path == (Coords(0, 0), Coords(1, 0))
+    assert view.value(Coords(1, 0)) == CellValues.PATH
+    assert not view.is_valid_road(Coords(1, 0))
+    assert set(view.adjacent_roads(Coords(1, 1))) == {Coords(1, 2)}
+    assert maze.value(Coords(1, 0)) == CellValues.ROAD
+
+    assert view.pop() == Coords(1, 0)
+    assert view.value(Coords(1, 0)) == CellValues.ROAD
+    assert set(view.adjacent_roads(Coords(1, 1))) == {Coords(1, 0), Coords(1, 2)}
+    assert len(view) == 1
+
+
+def test_push_rejects_blocks_and_marked_cells(maze):
+    view = MazeView(maze, (Coords(0, 0),))
+    with pytest.raises(RuntimeError):
+        view.push(Coords(0, 0))
+    with pytest.raises(RuntimeError):
+        view.push(Coords(0, 1))
+
+
+def test_grid_and_copy_have_the_path(maze):
+    path = (Coords(0, 0), Coords(1, 0), Coords(1, 1))
+    view = MazeView(maze, path)
+    expected = np.array(ROWS, dtype=np.uint8)
+    expected[0, :2] = expected[1, 1] = CellValues.PATH.value
+    assert np.array_equal(view.grid, expected)
+    assert np.array_equal(view.to_maze().cell_array.grid, expected)
+    assert not np.any(maze.cell_array.grid == CellValues.PATH.value)
+
+
+def test_take_changes(maze):
+    view = MazeView(maze, (Coords(0, 0),))
+    # Nothing is tracked before the first call
+    assert len(view.take_changes()[0]) == 0
+    view.push(Coords(1, 0))
+    view.push(Coords(1, 1))
+    view.pop()
+    flat_ids, values = view.take_changes()
+    changes = dict(zip(flat_ids.tolist(), values.tolist()))
+    assert changes == {1: CellValues.PATH.value, 4: CellValues.ROAD.value}
+    assert len(view.take_changes()[0]) == 0
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from maze.basic_maze import MazeView
+from maze.generators import kruskal
+from maze.rendering import AnimatedMazeRenderer
+from solvers.simple import SimpleMazeSolver
+
+
+def replay(renderer):
+    """The grid after each recorded frame."""
+    grid = renderer._initial_grid.copy()
+    grids = [grid.copy()]
+    for changed, values in renderer.frames:
+        grid.reshape(-1)[changed] = values
+        grids.append(grid.copy())
+    return grids
+
+
+def walk(maze):
+    """Coords to push along the path to the end, then None to pop back half
+    way."""
+    path = SimpleMazeSolver(maze).solve()
+    return list(path) + [None] * (len(path) // 2)
+
+
+def step(view, coords):
+    if coords is None:
+        view.pop()
+    else:
+        view.push(coords)
+
+
+@pytest.fixture
+def maze():
+    return kruskal(21, 31, seed=1)
+
+
+def test_frames_replay_to_the_view(maze):
+    renderer = AnimatedMazeRenderer(fps=None, record=True, display=False)
+    view = MazeView(maze)
+    expected = []
+    for coords in walk(maze):
+        step(view, coords)
+        view.plot(renderer)
+        expected.append(view.grid)
+
+    grids = replay(renderer)
+    assert len(grids) == len(expected)
+    for grid, view_grid in zip(grids, expected):
+        assert np.array_equal(grid, view_grid)
+    # Only the one cell pushed or popped is copied per frame
+    assert all(len(changed) == 1 for changed, _ in renderer.frames)
+
+
+def test_steps_are_batched_but_forced_frames_are_drawn(maze):
+    renderer = AnimatedMazeRenderer(fps=None, steps_per_frame=5, record=True, display=False)
+    view = MazeView(maze)
+    steps = walk(maze)
+    for coords in steps:
+        step(view, coords)
+        view.plot(renderer)
+    view.plot(renderer, force=True)
+
+    grids = replay(renderer)
+    assert len(grids) == len(steps) // 5 + 1
+    assert np.array_equal(grids[-1], view.grid)
+
+
+def test_plain_grids_and_export(maze, tmp_path):
+    renderer = AnimatedMazeRenderer(fps=None, record=True, display=False)
+    view = MazeView(maze)
+    view.plot(renderer)
+    view.push(walk(maze)[0])
+    view.plot(renderer)
+    # A grid on its own is compared cell by cell against the last frame
+    renderer.draw(maze.cell_array.grid)
+    assert np.array_equal(replay(renderer)[-1], maze.cell_array.grid)
+
+    renderer.export(str(tmp_path / "search.gif"), fps=10)
+    assert (tmp_path / "search.gif").stat().st_size > 0
+    with pytest.raises(RuntimeError):
+        AnimatedMazeRenderer(display=False).export(str(tmp_path / "nothing.gif"))
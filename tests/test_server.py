@@ -0,0 +1,78 @@
+import asyncio
+import os
+import shutil
+
+import pytest
+
+from maze.cells import Coords
+from maze.generators import random_costs, random_obstacles
+from solvers.server import SolveServer, solve_batch
+from solvers.weighted import DijkstraMazeSolver
+from solvers.workers import MazeSource, init_worker
+
+
+@pytest.fixture
+def maze():
+    return random_obstacles(30, 30, seed=1)
+
+
+def test_solve_batch_keeps_errors_per_start(maze):
+    init_worker({"m": maze})
+    results = solve_batch("m", (29, 29), [(0, 0), (0.5, 0), (1,), (99, 0), (0, 0)])
+    assert isinstance(results[0], list) and results[0] == results[4]
+    assert all(isinstance(x, str) for x in results[1:4])
+
+
+def test_server_rejects_bad_starts_before_batching(maze):
+    async def run():
+        server = SolveServer({"m": maze}, max_workers=1, batch_window=0.05)
+        await server.start(port=0)
+        try:
+            starts = [[0, 0], [0.5, 0], [1], [99, 0], [0, 0]]
+            requests = [{"maze": "m", "start": x, "end": [29, 29]} for x in starts]
+            return await asyncio.gather(
+                *(server.handle_request(x) for x in requests), return_exceptions=True
+            ), server.batch_sizes.count
+        finally:
+            await server.close()
+
+    responses, num_batches = asyncio.run(run())
+    assert responses[0]["length"] == responses[4]["length"] > 0
+    assert all(isinstance(x, RuntimeError) for x in responses[1:4])
+    assert num_batches == 1
+
+
+def test_weighted_batches_are_the_cheapest(maze):
+    random_costs(maze, seed=1)
+    init_worker({"m": maze})
+    starts = [(0, 0), (5, 3), (12, 20), (29, 0)]
+    results = solve_batch("m", (29, 29), starts)
+    for start, path in zip(starts, results):
+        expected = DijkstraMazeSolver(maze, Coords(*start), Coords(29, 29)).solve()
+        if path:
+            assert maze.path_cost([Coords(*x) for x in path]) == maze.path_cost(expected)
+        else:
+            assert not expected
+
+
+def test_maze_shapes_are_loaded_by_the_workers(maze, tmp_path):
+    file_path = str(tmp_path / "mazes.xlsx")
+    shutil.copy(os.path.join(os.path.dirname(__file__), "..", "mazes.xlsx"), file_path)
+    source = MazeSource(file_path)
+    expected = source.load()
+
+    async def run():
+        server = SolveServer({"m": maze, "source": source}, max_workers=1)
+        await server.start(port=0)
+        try:
+            shapes = await asyncio.gather(
+                server.maze_shape("m"), server.maze_shape("source"), server.maze_shape("source")
+            )
+            with pytest.raises(RuntimeError):
+                await server.maze_shape("other")
+            return shapes
+        finally:
+            await server.close()
+
+    shape = (expected.num_rows, expected.num_cols)
+    assert asyncio.run(run()) == [(30, 30), shape, shape]
@@ -0,0 +1,196 @@
+import heapq
+import random
+
+import numpy as np
+import pytest
+
+from maze.basic_maze import Maze
+from maze.cells import CellValues, Coords
+from maze.generators import kruskal, random_costs, random_obstacles
+from maze.rendering import MazeRenderer
+from solvers.compiled import CompiledAStarMazeSolver, CompiledBreadthFirstMazeSolver
+from solvers.hierarchical import HierarchicalMazeSolver
+from solvers.incremental import DStarLiteMazeSolver
+from solvers.jump_point import JumpPointMazeSolver
+from solvers.optimal import AStarMazeSolver, BidirectionalMazeSolver, BreadthFirstMazeSolver
+from solvers.query import DistanceFieldMazeSolver
+from solvers.simple import PseudoDirectionalMazeSolver, SimpleMazeSolver
+from solvers.wavefront import WavefrontMazeSolver
+from solvers.weighted import DijkstraMazeSolver, WeightedAStarMazeSolver
+
+OPTIMAL_SOLVERS = [
+    AStarMazeSolver,
+    BidirectionalMazeSolver,
+    CompiledAStarMazeSolver,
+    CompiledBreadthFirstMazeSolver,
+    DijkstraMazeSolver,
+    DistanceFieldMazeSolver,
+    DStarLiteMazeSolver,
+    JumpPointMazeSolver,
+    WavefrontMazeSolver,
+    WeightedAStarMazeSolver,
+]
+
+
+def random_cases(n, seed=0):
+    """Random mazes of random shape and density, with random road starts and
+    ends, some of them unreachable from each other."""
+    rng = random.Random(seed)
+    for _ in range(n):
+        num_rows, num_cols = rng.randint(1, 40), rng.randint(1, 40)
+        maze = random_obstacles(
+            num_rows, num_cols, density=rng.choice((0.1, 0.3, 0.5)), seed=rng.randrange(10**6)
+        )
+        roads = np.argwhere(maze.cell_array.road_mask)
+        start, end = (Coords(int(x), int(y)) for y, x in rng.choices(roads.tolist(), k=2))
+        yield maze, start, end
+
+
+@pytest.mark.parametrize("solver_class", OPTIMAL_SOLVERS, ids=lambda x: x.__name__)
+def test_optimal_solvers_match_breadth_first(solver_class):
+    for maze, start, end in random_cases(60):
+        reference = BreadthFirstMazeSolver(maze, start, end)
+        expected = reference.solve()
+        path = solver_class(maze, start, end).solve()
+        assert len(path) == len(expected)
+        if path:
+            assert reference.validate_path(path)
+
+
+@pytest.mark.parametrize(
+    "solver_class", [HierarchicalMazeSolver, SimpleMazeSolver, PseudoDirectionalMazeSolver]
+)
+def test_other_solvers_find_valid_paths(solver_class):
+    # Perfect mazes, the recursive solvers are exponential on open ones
+    for seed in range(10):
+        maze = kruskal(21, 31, seed=seed)
+        reference = BreadthFirstMazeSolver(maze)
+        path = solver_class(maze).solve()
+        assert reference.validate_path(path)
+        assert len(path) >= len(reference.solve())
+
+
+def cheapest_cost(maze, start, end):
+    """Plain Dijkstra over the maze's own adjacency, as a reference."""
+    costs = {start: 0}
+    heap = [(0, start.y, start.x)]
+    while heap:
+        cost, y, x = heapq.heappop(heap)
+        coords = Coords(x, y)
+        if coords == end:
+            return cost
+        if cost > costs[coords]:
+            continue
+        for neighbour in maze.adjacent_roads(coords):
+            new_cost = cost + int(maze.costs[neighbour.y, neighbour.x])
+            if new_cost < costs.get(neighbour, new_cost + 1):
+                costs[neighbour] = new_cost
+                heapq.heappush(heap, (new_cost, neighbour.y, neighbour.x))
+    return None
+
+
+@pytest.mark.parametrize("solver_class", [DijkstraMazeSolver, WeightedAStarMazeSolver])
+def test_weighted_solvers_find_the_cheapest_path(solver_class):
+    for maze, start, end in random_cases(40, seed=1):
+        random_costs(maze, seed=maze.num_rows * maze.num_cols)
+        path = solver_class(maze, start, end).solve()
+        expected = cheapest_cost(maze, start, end)
+        if expected is None:
+            assert not path
+        else:
+            assert BreadthFirstMazeSolver(maze, start, end).validate_path(path)
+            assert maze.path_cost(path) == expected
+
+
+def test_incremental_solver_tracks_edits():
+    rng = random.Random(1)
+    maze = random_obstacles(30, 30, density=0.2, seed=1)
+    solver = DStarLiteMazeSolver(maze)
+    solver.solve()
+    for _ in range(30):
+        coords = Coords(rng.randrange(30), rng.randrange(30))
+        if coords in (solver.start_coords, solver.end_coords):
+            continue
+        value = CellValues.PATH if maze.value(coords) == CellValues.ROAD else CellValues.ROAD
+        if maze.value(coords) == CellValues.BLOCK:
+            continue
+        path = solver.apply_edits([(coords, value)])
+        assert len(path) == len(BreadthFirstMazeSolver(maze).solve())
+    solver.close()
+
+
+def test_unreachable_end():
+    maze = Maze([[0, 1, 0], [0, 1, 0], [0, 1, 0]])
+    for solver_class in OPTIMAL_SOLVERS + [HierarchicalMazeSolver, SimpleMazeSolver]:
+        assert not solver_class(maze).solve()
+
+
+def test_stats_with_an_unreachable_pair():
+    maze = Maze([[0, 1, 0], [0, 1, 0], [0, 1, 0]])
+    solver = BreadthFirstMazeSolver(
+        maze, starts=[Coords(0, 0)], ends=[Coords(0, 2), Coords(2, 2)]
+    )
+    stats = solver.solver_stats(n=2, all_pairs=True)
+    assert len(stats.results_sets) == 4
+    assert not stats.all_paths_valid
+    assert stats.total_score is None
+    assert "Total score for 4 tests: n/a" in repr(stats)
+    assert "Path cost score (3.00)" in repr(stats)
+
+    stats.results_sets[0].path_cost = None
+    assert stats.cost_score is None
+    assert "Path cost score" not in repr(stats)
+
+
+@pytest.mark.parametrize("num_starts, num_ends", [(1, 1), (5, 1), (1, 5), (4, 3)])
+def test_dijkstra_pairs_are_the_cheapest(num_starts, num_ends):
+    rng = random.Random(num_starts * 10 + num_ends)
+    for maze, _, _ in random_cases(15, seed=2):
+        random_costs(maze, seed=maze.num_rows * maze.num_cols)
+        roads = [Coords(int(x), int(y)) for y, x in np.argwhere(maze.cell_array.road_mask)]
+        starts = rng.choices(roads, k=num_starts)
+        ends = rng.choices(roads, k=num_ends)
+        solver = DijkstraMazeSolver(maze, starts=starts, ends=ends)
+        for (start, end), path in solver.solve_pairs().items():
+            expected = cheapest_cost(maze, start, end)
+            if expected is None:
+                assert not path
+            else:
+                assert solver.check_path(path, (start,), (end,)).is_valid
+                assert maze.path_cost(path) == expected
+
+
+def test_compiled_astar_expands_like_astar():
+    for maze, start, end in random_cases(30, seed=3):
+        counters = []
+        for solver_class in (AStarMazeSolver, CompiledAStarMazeSolver):
+            solver = solver_class(maze, start, end, instrument=True)
+            solver.profile_solve()
+            counters.append(solver.instruments.counters)
+        assert counters[0] == counters[1]
+
+
+class RecordingRenderer(MazeRenderer):
+    def __init__(self):
+        super().__init__()
+        self.frames = []
+
+    def draw(self, grid):
+        self.frames.append(np.array(grid))
+
+
+@pytest.mark.parametrize("solver_class", [SimpleMazeSolver, PseudoDirectionalMazeSolver])
+def test_simple_solvers_draw_the_original_maze(solver_class):
+    maze = kruskal(21, 31, seed=1)
+    renderer = RecordingRenderer()
+    solver = solver_class(maze, visualize=True, renderer=renderer)
+    path = solver.solve()
+    assert path and len(renderer.frames) > 2
+
+    # Dead ends are searched as blocks but still drawn as roads
+    blocks = maze.cell_array.grid == CellValues.BLOCK.value
+    pruned_blocks = solver.pruned_maze().cell_array.grid == CellValues.BLOCK.value
+    assert np.count_nonzero(pruned_blocks) > np.count_nonzero(blocks)
+    for frame in renderer.frames:
+        assert np.array_equal(frame == CellValues.BLOCK.value, blocks)
+    assert np.count_nonzero(renderer.frames[-1] == CellValues.PATH.value) == len(path)
@@ -0,0 +1,50 @@
+import gzip
+
+import numpy as np
+import pytest
+
+from maze.basic_maze import Maze
+from maze.cells import CellValues, Coords
+
+EXPECTED = np.array([[0, 1, 0, 0], [0, 0, 1, 0], [1, 0, 0, 0]], dtype=np.uint8)
+
+TEXTS = {
+    "csv": "0,1,0,0\n0, 0, 1, 0\n1,0,0,0\n",
+    "spaced": "0 1 0 0\n0 0 1 0\r\n\n1 0 0 0",
+    "packed": "0100\n0010\n1000\n",
+    "ascii": ".#..\n..#.\n#...\n",
+}
+
+
+@pytest.mark.parametrize("name", TEXTS)
+@pytest.mark.parametrize("compress", [False, True])
+def test_formats(tmp_path, name, compress):
+    file_path = tmp_path / "maze.txt"
+    data = TEXTS[name].encode()
+    file_path.write_bytes(gzip.compress(data) if compress else data)
+    assert np.array_equal(Maze.load_from_text(str(file_path)), EXPECTED)
+
+
+def test_buffer_grows_past_the_estimate(tmp_path):
+    file_path = tmp_path / "maze.txt.gz"
+    grid = np.random.default_rng(1).integers(0, 2, size=(3000, 5), dtype=np.uint8)
+    file_path.write_bytes(gzip.compress("\n".join("".join(map(str, r)) for r in grid).encode()))
+    assert np.array_equal(Maze.load_from_text(str(file_path)), grid)
+
+
+@pytest.mark.parametrize("text", ["0 1\n0 1 0\n", "0,1\n0,x\n", "\n\n"])
+def test_bad_files_raise(tmp_path, text):
+    file_path = tmp_path / "maze.txt"
+    file_path.write_text(text)
+    with pytest.raises(RuntimeError):
+        Maze.load_from_text(str(file_path))
+
+
+def test_create_maze_with_costs(tmp_path):
+    (tmp_path / "maze.txt").write_text(TEXTS["ascii"])
+    (tmp_path / "costs.csv").write_text("1,1,2,3\n4,5,6,7\n8,9,1,1\n")
+    maze = Maze.create_maze_from_text(
+        str(tmp_path / "maze.txt"), cost_file_path=str(tmp_path / "costs.csv")
+    )
+    assert maze.value(Coords(1, 0)) == CellValues.BLOCK
+    assert maze.path_cost((Coords(0, 0), Coords(0, 1), Coords(1, 1))) == 9